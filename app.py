@@ -1,32 +1,103 @@
-from flask import Flask, request, render_template, redirect, url_for, session, flash
-from resume_parser import parse_resume_text
-from job_scraper import scrape_jobs
-from matcher import match_jobs
+import time
+STARTED_AT = time.perf_counter()
+
+from flask import Flask, request, render_template, redirect, url_for, session, flash, g
+import bookmarks
+import database
+import metrics
+import parse_pool
+import pdf_extract
+import resume_cache
+import skills
+import tasks
+import logging
+import multiprocessing
 import os
 import sqlite3
+import threading
+import uuid
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Heavy libraries and models (PyPDF2, scikit-learn, the job index, spaCy in the
+# parser workers) are loaded on first use or by the background warm-up below,
+# so importing this module stays fast and the server binds right away.
+
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 app.secret_key = os.urandom(24)  # Secret key for session management
 
-# Database init (SQLite)
-def init_db():
-    with sqlite3.connect("jobs.db") as conn:
-        c = conn.cursor()
-        # Create users table
-        c.execute('''CREATE TABLE IF NOT EXISTS users
-                     (id INTEGER PRIMARY KEY, username TEXT UNIQUE, password_hash TEXT)''')
-        # Create jobs table
-        c.execute('''CREATE TABLE IF NOT EXISTS jobs
-                     (id INTEGER PRIMARY KEY, title TEXT, company TEXT, location TEXT, description TEXT, url TEXT)''')
-        # Create bookmarks table
-        c.execute('''CREATE TABLE IF NOT EXISTS bookmarks
-                     (user_id INTEGER, job_id INTEGER,
-                      PRIMARY KEY (user_id, job_id),
-                      FOREIGN KEY (user_id) REFERENCES users(id),
-                      FOREIGN KEY (job_id) REFERENCES jobs(id))''')
-        conn.commit()
-init_db()
+# Number of best matching jobs shown after an upload
+MAX_RESULTS = 50
+# Jobs per page of results, by default and at most
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Seconds between reloads of an upload's page while its task is still running
+UPLOAD_REFRESH_SECONDS = 2
+# Set WARMUP=0 to skip loading models in the background at startup
+WARMUP = os.environ.get("WARMUP", "1") != "0"
+
+startup = {"import_seconds": None, "warmup_seconds": None, "ready": False, "error": None}
+
+# Database init (SQLite), once per process on first use
+_db_ready = False
+_db_lock = threading.Lock()
+
+def ensure_db():
+    global _db_ready
+    if not _db_ready:
+        with _db_lock:
+            if not _db_ready:
+                database.init_db()
+                _db_ready = True
+
+@app.before_request
+def _ensure_db_before_request():
+    ensure_db()
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request_time(response):
+    if "request_started" in g and request.endpoint:
+        metrics.observe(f"request_{request.endpoint}", time.perf_counter() - g.request_started)
+    return response
+
+def warm_up():
+    """Load everything the upload path needs, so the first upload doesn't pay for it."""
+    try:
+        ensure_db()
+        from PyPDF2 import PdfReader
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        import matcher
+        import job_index
+        job_index.current_index()
+        parse_pool.get_pool().warm_up()
+    except Exception as e:
+        logger.exception("Warm-up failed")
+        startup["error"] = str(e)
+        return
+    startup["warmup_seconds"] = round(time.perf_counter() - STARTED_AT, 3)
+    startup["ready"] = True
+    logger.info("Warm-up finished %.3fs after startup", startup["warmup_seconds"])
+
+def start_warm_up():
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+# Liveness: the process is up and serving requests
+@app.route("/health")
+def health():
+    return {"status": "ok"}
+
+# Readiness: models are loaded and uploads will be served at full speed
+@app.route("/ready")
+def ready():
+    return startup, 200 if startup["ready"] else 503
+
+# Stage latencies (p50/p95/p99) in the Prometheus text format
+@app.route("/metrics")
+def metrics_endpoint():
+    gauges = {"upload_tasks_pending": tasks.get_queue().pending(), "app_ready": int(startup["ready"])}
+    return metrics.render_prometheus(gauges), 200, {"Content-Type": "text/plain; version=0.0.4"}
 
 # User registration route
 @app.route("/register", methods=["GET", "POST"])
@@ -39,10 +110,7 @@ def register():
             return redirect(url_for("register"))
         password_hash = generate_password_hash(password)
         try:
-            with sqlite3.connect("jobs.db") as conn:
-                c = conn.cursor()
-                c.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", (username, password_hash))
-                conn.commit()
+            database.create_user(database.connect(), username, password_hash)
             flash("Registration successful. Please log in.")
             return redirect(url_for("login"))
         except sqlite3.IntegrityError:
@@ -56,18 +124,15 @@ def login():
     if request.method == "POST":
         username = request.form.get("username")
         password = request.form.get("password")
-        with sqlite3.connect("jobs.db") as conn:
-            c = conn.cursor()
-            c.execute("SELECT id, password_hash FROM users WHERE username = ?", (username,))
-            user = c.fetchone()
-            if user and check_password_hash(user[1], password):
-                session["user_id"] = user[0]
-                session["username"] = username
-                flash("Logged in successfully.")
-                return redirect(url_for("index"))
-            else:
-                flash("Invalid username or password.")
-                return redirect(url_for("login"))
+        user = database.get_user(database.connect(), username)
+        if user and check_password_hash(user[1], password):
+            session["user_id"] = user[0]
+            session["username"] = username
+            flash("Logged in successfully.")
+            return redirect(url_for("index"))
+        else:
+            flash("Invalid username or password.")
+            return redirect(url_for("login"))
     return render_template("login.html")
 
 # User logout route
@@ -77,6 +142,84 @@ def logout():
     flash("You have been logged out.")
     return redirect(url_for("login"))
 
+def process_resume(file_bytes, profile=False):
+    """
+    Extract, parse and match an uploaded resume. Runs on the task queue.
+
+    Args:
+        file_bytes (bytes): The uploaded PDF.
+        profile (bool): Dump a cProfile of this upload to metrics.PROFILE_DIR.
+
+    Returns:
+        dict: {"resume": parsed resume, "jobs": ranked matching jobs}
+    """
+    with metrics.profiled("upload", enabled=profile):
+        return _process_resume(file_bytes)
+
+def process_upload(file_bytes, owner, result_id, profile=False):
+    """
+    Process an uploaded resume and store its ranked jobs as a result set for paging.
+
+    Returns:
+        dict: {"resume": parsed resume, "result_id": result set id, "total": ranked jobs stored}
+    """
+    result = process_resume(file_bytes, profile=profile)
+    with metrics.timed("db_write"):
+        total = resume_cache.put_result_set(result_id, owner, result["jobs"])
+    return {"resume": result["resume"], "result_id": result_id, "total": total}
+
+def _process_resume(file_bytes):
+    # Identical uploads are served from the cache, keyed on the file contents
+    digest = resume_cache.file_hash(file_bytes)
+    with metrics.timed("cache_read"):
+        resume_data = resume_cache.get_resume(digest)
+    if resume_data is None:
+        # Extract text from PDF
+        with metrics.timed("pdf_extract"):
+            full_text = pdf_extract.extract_text(file_bytes)
+
+        # Parse resume on the warm parser pool
+        with metrics.timed("parse_resume"):
+            resume_data = parse_pool.get_pool().parse(full_text)
+        with metrics.timed("db_write"):
+            resume_cache.put_resume(digest, resume_data)
+    logger.debug("Resume %s has %d characters of text", digest[:12], len(resume_data.get("full_text", "")))
+
+    # Cached results are only valid for the job corpus and index they were computed against
+    import job_index
+    index = job_index.current_index()
+    with database.connect() as conn:
+        corpus_version = (f"{index.version if index is not None else 0}/{database.corpus_version(conn)}"
+                          f"/{skills.TAXONOMY_VERSION}")
+    with metrics.timed("cache_read"):
+        matched_jobs = resume_cache.get_matches(digest, corpus_version)
+
+    if matched_jobs is None:
+        # Read the job corpus kept fresh by the ingestion worker (ingest.py)
+        with metrics.timed("load_jobs"), database.connect() as conn:
+            jobs = database.load_jobs(conn)
+        logger.debug("Matching against %d jobs", len(jobs))
+
+        # Validate resume text and job descriptions before matching
+        if not resume_data.get("full_text") or not any(job.get("description") for job in jobs):
+            logger.debug("Empty resume text or job descriptions, skipping matching")
+            matched_jobs = []
+        else:
+            # Match jobs; with an index only the best MAX_RESULTS candidates are scored and ranked
+            from matcher import match_jobs, match_top_k
+            with metrics.timed("match_jobs"):
+                if index is not None:
+                    matched_jobs = match_top_k(resume_data, jobs, index, k=MAX_RESULTS)
+                else:
+                    matched_jobs = match_jobs(resume_data, jobs)
+        with metrics.timed("db_write"):
+            resume_cache.put_matches(digest, corpus_version, matched_jobs)
+
+    return {"resume": resume_data, "jobs": matched_jobs}
+
+def wants_json():
+    return request.accept_mimetypes.best_match(["text/html", "application/json"]) == "application/json"
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     if "user_id" not in session:
@@ -87,86 +230,116 @@ def index():
         resume_file = request.files.get("resume")
         if not resume_file:
             return "No resume uploaded", 400
+        file_bytes = resume_file.read()
+        if len(file_bytes) > pdf_extract.MAX_BYTES:
+            return f"PDF is {len(file_bytes)} bytes, the limit is {pdf_extract.MAX_BYTES}", 413
 
-        # Extract text from PDF
-        from PyPDF2 import PdfReader
-        pdf_reader = PdfReader(resume_file)
-        full_text = ""
-        for page in pdf_reader.pages:
-            full_text += page.extract_text() + "\n"
-
-        # Parse resume
-        resume_data = parse_resume_text(full_text)
-        print("DEBUG: Extracted resume text:", resume_data.get("full_text", "")[:500])
-
-        # Scrape jobs (example: scraping Indeed for "software engineer")
-        jobs = scrape_jobs("software engineer", location="Remote")
-        print(f"DEBUG: Number of jobs scraped: {len(jobs)}")
-        for i, job in enumerate(jobs[:3]):
-            print(f"DEBUG: Job {i+1} description snippet: {job['description'][:200]}")
-
-        # Remove duplicate jobs by URL
-        seen_urls = set()
-        unique_jobs = []
-        for job in jobs:
-            if job["url"] not in seen_urls:
-                unique_jobs.append(job)
-                seen_urls.add(job["url"])
-        jobs = unique_jobs
-
-        # Store jobs in DB (replace old ones)
-        with sqlite3.connect("jobs.db") as conn:
-            c = conn.cursor()
-            c.execute("DELETE FROM jobs")
-            for job in jobs:
-                c.execute("INSERT INTO jobs (title, company, location, description, url) VALUES (?, ?, ?, ?, ?)",
-                          (job["title"], job["company"], job["location"], job["description"], job["url"]))
-            conn.commit()
-
-        # Validate resume text and job descriptions before matching
-        if not resume_data.get("full_text") or not any(job.get("description") for job in jobs):
-            print("DEBUG: Empty resume text or job descriptions detected, skipping matching.")
-            matched_jobs = []
-        else:
-            # Match jobs
-            matched_jobs = match_jobs(resume_data, jobs)
+        # The work runs on the bounded task queue; when it is full, ask the client to come back
+        try:
+            # ?profile=1 dumps a cProfile of the upload when PROFILE_DIR is set
+            task = tasks.get_queue().submit(process_upload, file_bytes, session["user_id"], uuid.uuid4().hex,
+                                            profile=request.args.get("profile") == "1", owner=session["user_id"])
+        except tasks.QueueFull:
+            return "Too many resumes are being processed, please retry shortly", 429, {"Retry-After": "5"}
 
-        # If user logged in, get bookmarked job ids
-        bookmarked_job_ids = set()
-        if "user_id" in session:
-            with sqlite3.connect("jobs.db") as conn:
-                c = conn.cursor()
-                c.execute("SELECT job_id FROM bookmarks WHERE user_id = ?", (session["user_id"],))
-                bookmarked_job_ids = set(row[0] for row in c.fetchall())
+        # API clients get the task ID right away and poll /tasks/<task_id>
+        if wants_json():
+            body = dict(task.to_dict(), status_url=url_for("task_status", task_id=task.id))
+            return body, 202, {"Location": body["status_url"]}
 
-        # Render results
-        return render_template("index.html", jobs=matched_jobs, resume=resume_data, uploaded=True, bookmarked_job_ids=bookmarked_job_ids)
+        # The form is sent to the upload's page, which shows the result once the task is done
+        return redirect(url_for("upload_result", task_id=task.id), code=303)
 
     # GET request
     return render_template("index.html", uploaded=False)
-    
+
+# Page of an upload sent from the form; reloads itself until the task is done
+@app.route("/uploads/<task_id>")
+def upload_result(task_id):
+    if "user_id" not in session:
+        return redirect(url_for("login"))
+    task = tasks.get_queue().get(task_id, owner=session["user_id"])
+    if task is None:
+        return "Unknown or expired upload", 404
+    if task.status in (tasks.QUEUED, tasks.RUNNING):
+        return ("Your resume is being processed; this page reloads until the matches are ready.", 202,
+                {"Refresh": str(UPLOAD_REFRESH_SECONDS)})
+    if task.status == tasks.FAILED:
+        if isinstance(task.error, pdf_extract.PdfTooLarge):
+            return str(task.error), 413
+        raise task.error
+
+    # Only the first page is rendered; the rest is read from /results/<result_id>
+    result_id = task.result["result_id"]
+    page = resume_cache.get_result_page(result_id, session["user_id"], limit=PAGE_SIZE)
+    if page is None:
+        return "Unknown or expired upload", 404
+    bookmarked_job_ids = bookmarks.job_ids(session["user_id"])
+
+    # Render results
+    with metrics.timed("render"):
+        return render_template("index.html", jobs=page["jobs"], resume=task.result["resume"],
+                               uploaded=True, bookmarked_job_ids=bookmarked_job_ids, result_id=result_id,
+                               total=page["total"], next_cursor=page["next"])
+
+# Poll an upload submitted with "Accept: application/json"
+@app.route("/tasks/<task_id>")
+def task_status(task_id):
+    if "user_id" not in session:
+        return {"error": "Unauthorized"}, 401
+    task = tasks.get_queue().get(task_id, owner=session["user_id"])
+    if task is None:
+        return {"error": "Unknown task"}, 404
+    body = task.to_dict()
+    if task.status == tasks.DONE:
+        body.update(task.result)
+        body["results_url"] = url_for("results", result_id=task.result["result_id"])
+    return body
+
+# Ranked jobs of an upload, one page at a time: /results/<result_id>?limit=20&cursor=<next_cursor>
+@app.route("/results/<result_id>")
+def results(result_id):
+    if "user_id" not in session:
+        return {"error": "Unauthorized"}, 401
+    try:
+        after = int(request.args.get("cursor", 0))
+        limit = min(int(request.args.get("limit", PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return {"error": "cursor and limit must be integers"}, 400
+    if after < 0 or limit < 1:
+        return {"error": "cursor must be >= 0 and limit >= 1"}, 400
+
+    page = resume_cache.get_result_page(result_id, session["user_id"], after, limit)
+    if page is None:
+        return {"error": "Unknown or expired result set"}, 404
+    bookmarked_job_ids = bookmarks.job_ids(session["user_id"])
+    for job in page["jobs"]:
+        job["bookmarked"] = job.get("id") in bookmarked_job_ids
+    next_cursor = None if page["next"] is None else str(page["next"])
+    return {"result_id": result_id, "total": page["total"], "jobs": page["jobs"], "next_cursor": next_cursor,
+            "next_url": next_cursor and url_for("results", result_id=result_id, cursor=next_cursor, limit=limit)}
+
 # Route to toggle bookmark for a job (AJAX)
 @app.route("/bookmark/<int:job_id>", methods=["POST"])
 def bookmark(job_id):
     if "user_id" not in session:
         return {"error": "Unauthorized"}, 401
     user_id = session["user_id"]
-    with sqlite3.connect("jobs.db") as conn:
-        c = conn.cursor()
-        c.execute("SELECT 1 FROM bookmarks WHERE user_id = ? AND job_id = ?", (user_id, job_id))
-        exists = c.fetchone()
-        if exists:
-            c.execute("DELETE FROM bookmarks WHERE user_id = ? AND job_id = ?", (user_id, job_id))
-            conn.commit()
-            return {"status": "removed"}
-        else:
-            c.execute("INSERT INTO bookmarks (user_id, job_id) VALUES (?, ?)", (user_id, job_id))
-            conn.commit()
-            return {"status": "added"}
+    if bookmarks.toggle(user_id, job_id):
+        return {"status": "added"}
+    return {"status": "removed"}
+
+startup["import_seconds"] = round(time.perf_counter() - STARTED_AT, 3)
+logger.info("App imported in %.3fs", startup["import_seconds"])
+# Parser worker processes may re-import this module (spawn start method); only the server warms up
+if WARMUP and multiprocessing.parent_process() is None:
+    start_warm_up()
+elif not WARMUP:
+    # Nothing is preloaded: models load on first use, so there is nothing to wait for
+    startup["ready"] = True
 
 if __name__ == "__main__":
     import webbrowser
-    import threading
 
     def open_browser():
         webbrowser.open_new("http://127.0.0.1:5000/")
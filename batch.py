@@ -0,0 +1,205 @@
+# batch.py - Score a directory or zip archive of resumes against the job corpus
+#
+#   python batch.py resumes/ --output results.csv --top 10
+#   python batch.py resumes.zip --output results.jsonl
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import zipfile
+
+import numpy as np
+import scipy.sparse as sp
+
+import database
+import job_index
+import parse_pool
+import pdf_extract
+from matcher import combined_scores, eligibility_labels, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+# Resumes parsed and multiplied against the job matrix together
+CHUNK_SIZE = 64
+CSV_FIELDS = ["resume", "rank", "job_id", "title", "company", "location", "url", "match_score", "eligibility"]
+
+def iter_resume_pdfs(source):
+    """
+    Yield the PDF resumes found in a directory (recursively) or a zip archive.
+
+    Args:
+        source (str): Path to a directory or a .zip file.
+
+    Yields:
+        tuple: (name, bytes) for each PDF, in name order.
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in sorted(archive.namelist()):
+                if name.lower().endswith(".pdf"):
+                    yield name, archive.read(name)
+    elif os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(".pdf"))
+        for path in sorted(paths):
+            with open(path, "rb") as f:
+                yield os.path.relpath(path, source), f.read()
+    else:
+        raise ValueError(f"{source} is neither a directory nor a zip archive")
+
+def parse_resumes(pdfs, pool=None, chunk_size=CHUNK_SIZE):
+    """
+    Extract each chunk of resumes in parallel, then parse it on the parser pool.
+
+    Files that cannot be read are logged and skipped.
+
+    Yields:
+        tuple: (name, resume_data) as returned by parse_resume_text.
+    """
+    pool = pool or parse_pool.get_pool()
+    for chunk in _chunks(pdfs, chunk_size):
+        names = []
+        texts = []
+        extracted = pdf_extract.extract_texts([data for _, data in chunk])
+        for (name, _), text in zip(chunk, extracted):
+            if isinstance(text, Exception):
+                logger.warning("Skipping %s: %s", name, text)
+            else:
+                texts.append(text)
+                names.append(name)
+        yield from zip(names, pool.map(texts))
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def match_resumes(resumes, jobs, index, k=10, chunk_size=CHUNK_SIZE):
+    """
+    Rank the jobs for many parsed resumes.
+
+    Each chunk of resumes is vectorized at once and scored against every job with
+    two sparse matrix products: resume x job text similarity, and resume x job
+    skill hits from the resume and job skill presence matrices.
+
+    Args:
+        resumes (iterable): (name, resume_data) pairs, e.g. from parse_resumes().
+        jobs (list): Current job corpus, all of which must be in `index`.
+        index (JobIndex): Job index covering `jobs`.
+        k (int): Number of jobs to keep per resume.
+        chunk_size (int): Resumes scored per matrix product.
+
+    Yields:
+        tuple: (name, results) where results are up to k job dicts with 'match_score' and 'eligibility', best first.
+    """
+    rows = index.rows_for(jobs)
+    job_matrix = index.matrix[rows].T.tocsr()
+    job_skills = index.skill_matrix[rows].T.tocsr()
+
+    for chunk in _chunks(resumes, chunk_size):
+        texts = [resume_data.get("full_text", "") for _, resume_data in chunk]
+        similarity = (index.transform(texts) @ job_matrix).tocsr()
+
+        skill_rows = []
+        skill_cols = []
+        for i, (_, resume_data) in enumerate(chunk):
+            columns = index.skill_columns(resume_data.get("skills", []))
+            skill_rows.extend([i] * len(columns))
+            skill_cols.extend(columns)
+        resume_skills = sp.csr_matrix((np.ones(len(skill_rows)), (skill_rows, skill_cols)),
+                                      shape=(len(chunk), len(index.skills)))
+        skill_hits = (resume_skills @ job_skills).tocsr()
+
+        for i, (name, resume_data) in enumerate(chunk):
+            scores = combined_scores(similarity[i].toarray().ravel(), skill_hits[i].toarray().ravel(), resume_data)
+            top = top_k_indices(scores, k)
+            results = []
+            for j, eligibility in zip(top, eligibility_labels(scores[top])):
+                job = dict(jobs[j])
+                job["match_score"] = round(float(scores[j]), 2)
+                job["eligibility"] = str(eligibility)
+                results.append(job)
+            yield name, results
+
+def load_corpus():
+    """
+    Read the job corpus and an index that covers all of it.
+
+    The published index is used when it is current; otherwise a fresh one is
+    fitted in memory, which is cheap next to scoring a whole batch.
+
+    Returns:
+        tuple: (jobs, JobIndex)
+    """
+    with database.connect() as conn:
+        jobs = database.load_jobs(conn)
+    index = job_index.current_index()
+    if index is None or (index.rows_for(jobs) < 0).any():
+        index = job_index.JobIndex.build(jobs)
+    return jobs, index
+
+def write_results(ranked, out, fmt="csv"):
+    """
+    Write ranked results as they are produced, one line per resume/job pair.
+
+    Args:
+        ranked (iterable): (name, results) pairs from match_resumes().
+        out (file): Text file to write to.
+        fmt (str): "csv" or "jsonl".
+
+    Returns:
+        int: Number of resumes written.
+    """
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    count = 0
+    for name, results in ranked:
+        for rank, job in enumerate(results, start=1):
+            row = {"resume": name, "rank": rank, "job_id": job.get("id"), "title": job.get("title"),
+                   "company": job.get("company"), "location": job.get("location"), "url": job.get("url"),
+                   "match_score": job["match_score"], "eligibility": job["eligibility"]}
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                out.write(json.dumps(row) + "\n")
+        out.flush()
+        count += 1
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank the job corpus for a batch of PDF resumes.")
+    parser.add_argument("source", help="Directory of PDF resumes or a zip archive of them")
+    parser.add_argument("--output", "-o", default="-", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="Output format (default: from the output extension, else csv)")
+    parser.add_argument("--top", type=int, default=10, help="Jobs to keep per resume")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Resumes scored per matrix product")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    fmt = args.format or ("jsonl" if args.output.endswith((".jsonl", ".json")) else "csv")
+    jobs, index = load_corpus()
+    logger.info("Scoring against %d jobs", len(jobs))
+
+    ranked = match_resumes(parse_resumes(iter_resume_pdfs(args.source)), jobs, index,
+                           k=args.top, chunk_size=args.chunk_size)
+    if args.output == "-":
+        count = write_results(ranked, sys.stdout, fmt)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            count = write_results(ranked, out, fmt)
+    logger.info("Wrote results for %d resumes", count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# benchmarks - Reproducible benchmarks on synthetic resumes, job corpora and result pages
@@ -0,0 +1,244 @@
+# run.py - Benchmark resume parsing, matching, scraper parsing and uploads, and compare runs
+#
+#   python -m benchmarks.run                                  # everything, saved to benchmarks/results/
+#   python -m benchmarks.run --only match --sizes 100 10000
+#   python -m benchmarks.run --compare benchmarks/results/<earlier run>.json
+#
+# Inputs come from benchmarks/synthetic.py (seeded) and the stored result page
+# fixtures, so runs on the same machine are comparable.
+
+import argparse
+import json
+import logging
+import os
+import platform as host_platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import synthetic
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SIZES = [100, 10_000, 100_000]
+BENCHMARKS = ["parse", "match", "scrape", "upload"]
+REPEAT = 20
+# Resumes per parsing benchmark and uploads per upload benchmark
+RESUMES = 50
+# Jobs in the corpus behind the upload benchmark
+UPLOAD_JOBS = 1000
+# p50 slowdown, relative to the baseline, reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+def measure(fn, repeat=REPEAT, items=1, warmup=1):
+    """
+    Time fn() `repeat` times after `warmup` untimed calls.
+
+    Args:
+        fn (callable): The operation to time.
+        repeat (int): Timed calls.
+        items (int): Items one call processes, for the throughput.
+        warmup (int): Untimed calls first, to fill caches and load models.
+
+    Returns:
+        dict: Latency of one call in seconds (min, p50, p95, mean) and items per second at the p50.
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings, items)
+
+def summarize(timings, items=1):
+    timings = sorted(timings)
+    p50 = timings[len(timings) // 2]
+    return {"repeat": len(timings), "items": items, "min": timings[0], "p50": p50,
+            "p95": timings[min(len(timings) - 1, int(0.95 * len(timings)))],
+            "mean": sum(timings) / len(timings), "throughput": items / p50 if p50 else None}
+
+def _spacy_missing():
+    import resume_parser
+    try:
+        resume_parser.get_nlp()
+    except OSError as e:
+        return f"spaCy model unavailable: {e}"
+    return None
+
+def bench_parse(args):
+    """parse_resume_text on one resume at a time, and parse_resume_texts on a batch."""
+    skipped = _spacy_missing()
+    if skipped:
+        return {"parse_resume_text": {"skipped": skipped}}
+    from resume_parser import parse_resume_text, parse_resume_texts
+    texts = synthetic.make_resumes(RESUMES, seed=args.seed)
+    position = iter(range(10 ** 9))
+    return {"parse_resume_text": measure(lambda: parse_resume_text(texts[next(position) % len(texts)]),
+                                         repeat=args.repeat * 5),
+            "parse_resume_texts": measure(lambda: parse_resume_texts(texts), repeat=max(1, args.repeat // 4),
+                                          items=len(texts))}
+
+def bench_match(args):
+    """match_jobs (vectorizer fitted per call) and match_top_k against a prebuilt index, per corpus size."""
+    from job_index import JobIndex
+    from matcher import match_jobs, match_top_k
+    resume = synthetic.resume_data(synthetic.make_resumes(1, seed=args.seed)[0])
+    # Pay for the scikit-learn import before anything is timed
+    match_jobs(resume, synthetic.make_jobs(10, seed=args.seed))
+    results = {}
+    for size in args.sizes:
+        jobs = synthetic.make_jobs(size, seed=args.seed)
+        # Fewer repetitions on big corpora keep the suite within minutes
+        repeat = max(1, min(args.repeat, 100_000 // size))
+        results[f"match_jobs[{size}]"] = measure(lambda: match_jobs(resume, jobs), repeat=repeat, warmup=0,
+                                                 items=size)
+        start = time.perf_counter()
+        index = JobIndex.build(jobs)
+        results[f"index_build[{size}]"] = summarize([time.perf_counter() - start], items=size)
+        results[f"match_top_k[{size}]"] = measure(lambda: match_top_k(resume, jobs, index, k=50),
+                                                  repeat=args.repeat, items=size)
+    return results
+
+def bench_scrape(args):
+    """parse_cards on each platform's stored result page fixture."""
+    from job_scraper import PLATFORMS, parse_cards
+    results = {}
+    for platform in PLATFORMS:
+        html = synthetic.load_fixture(platform)
+        cards = len(parse_cards(html, platform, limit=None))
+        results[f"parse_cards[{platform}]"] = measure(lambda: parse_cards(html, platform, limit=None),
+                                                      repeat=args.repeat * 5, items=cards)
+    return results
+
+def bench_upload(args):
+    """
+    The whole `/` upload path through the Flask test client: extraction, parsing,
+    matching and the cache writes, from submission until the task is done.
+
+    Runs in a temporary directory with its own jobs.db, cache.db and job index, and
+    uploads a different resume each time so every upload misses the caches.
+    """
+    skipped = _spacy_missing()
+    if skipped:
+        return {f"upload[{UPLOAD_JOBS}]": {"skipped": skipped}}
+    os.environ.setdefault("WARMUP", "0")
+    import io
+    import app
+    import database
+    import job_index
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # The app's databases and index use relative paths, so they land in workdir
+        os.chdir(workdir)
+        try:
+            database.init_db()
+            with database.connect() as conn:
+                database.upsert_jobs(conn, synthetic.make_jobs(UPLOAD_JOBS, seed=args.seed), ttl=3600)
+                job_index.refresh_index(database.load_jobs(conn))
+
+            client = app.app.test_client()
+            client.post("/register", data={"username": "bench", "password": "bench"})
+            client.post("/login", data={"username": "bench", "password": "bench"})
+            pdfs = iter([synthetic.make_pdf(text) for text in synthetic.make_resumes(RESUMES + 1, seed=args.seed)])
+
+            def upload():
+                r = client.post("/", data={"resume": (io.BytesIO(next(pdfs)), "resume.pdf")},
+                                headers={"Accept": "application/json"})
+                status_url = r.json["status_url"]
+                while True:
+                    body = client.get(status_url).json
+                    if body["status"] in ("done", "failed"):
+                        if body["status"] == "failed":
+                            raise RuntimeError(body["error"])
+                        return
+                    time.sleep(0.001)
+
+            return {f"upload[{UPLOAD_JOBS}]": measure(upload, repeat=RESUMES)}
+        finally:
+            database.close_connections()
+            os.chdir(cwd)
+
+RUNNERS = {"parse": bench_parse, "match": bench_match, "scrape": bench_scrape, "upload": bench_upload}
+
+def run(args):
+    results = {}
+    for name in args.only or BENCHMARKS:
+        logger.info("Running %s benchmarks", name)
+        results.update(RUNNERS[name](args))
+    return {"meta": _meta(args), "results": results}
+
+def _meta(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": sys.version.split()[0],
+            "platform": host_platform.platform(), "cpus": os.cpu_count(), "seed": args.seed,
+            "sizes": args.sizes, "repeat": args.repeat}
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compare the p50 latency of every benchmark present in both runs.
+
+    Returns:
+        list: (name, baseline p50, current p50, relative change, is regression) rows.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before or "p50" not in before or "p50" not in result:
+            continue
+        change = (result["p50"] - before["p50"]) / before["p50"] if before["p50"] else 0.0
+        rows.append((name, before["p50"], result["p50"], change, change > threshold))
+    return rows
+
+def print_results(report, comparison=None, out=sys.stdout):
+    changes = {row[0]: row for row in comparison or []}
+    for name, result in report["results"].items():
+        if "skipped" in result:
+            out.write(f"{name:<32} skipped ({result['skipped']})\n")
+            continue
+        line = f"{name:<32} p50 {result['p50'] * 1000:10.3f} ms  p95 {result['p95'] * 1000:10.3f} ms"
+        if result["throughput"]:
+            line += f"  {result['throughput']:12.1f} items/s"
+        if name in changes:
+            _, _, _, change, regression = changes[name]
+            line += f"  {change:+7.1%}" + ("  REGRESSION" if regression else "")
+        out.write(line + "\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume matcher on synthetic data.")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Benchmarks to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="Job corpus sizes for matching")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Base number of timed repetitions")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data")
+    parser.add_argument("--output", "-o", help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative p50 slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    report = run(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info("Results written to %s", output)
+
+    comparison = None
+    if args.compare:
+        with open(args.compare) as f:
+            comparison = compare(report, json.load(f), args.threshold)
+    print_results(report, comparison)
+    # A non-zero exit lets CI fail on regressions
+    return 1 if comparison and any(row[4] for row in comparison) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
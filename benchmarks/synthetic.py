@@ -0,0 +1,193 @@
+# synthetic.py - Deterministic synthetic resumes, job corpora and result pages for the benchmarks
+#
+# Everything is generated from a seeded random.Random, so two runs with the same
+# seed benchmark exactly the same inputs.
+#
+# Regenerate the stored scraper fixtures:   python -m benchmarks.synthetic
+
+import os
+import random
+import re
+
+from skills import SKILLS, find_skills
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+# Job cards in each stored result page fixture
+FIXTURE_CARDS = 25
+
+TITLES = ["Software Engineer", "Data Scientist", "Backend Developer", "Frontend Developer", "ML Engineer",
+          "Data Analyst", "Full Stack Developer", "DevOps Engineer", "Platform Engineer", "QA Engineer"]
+LEVELS = ["Junior", "Senior", "Staff", "Lead", "Principal", ""]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay", "Stark", "Wayne", "Tyrell", "Soylent"]
+LOCATIONS = ["Remote", "New York, NY", "San Francisco, CA", "Berlin", "London", "Toronto", "Austin, TX"]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Science in Data Science",
+           "PhD in Machine Learning", "Associate degree in Information Technology", "Bachelor of Engineering"]
+UNIVERSITIES = ["State University", "Institute of Technology", "University of Somewhere", "City College"]
+# Filler vocabulary so texts have a realistic share of non-skill words
+WORDS = ("build maintain design scalable services team product customers deliver features testing deployment "
+         "cloud pipelines performance reliability collaborate stakeholders requirements code review mentor "
+         "architecture data platform api latency users growth quality automation monitoring").split()
+
+def _sentence(rng, length=12):
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+def _skills(rng, low=2, high=6):
+    return rng.sample(SKILLS, rng.randint(low, high))
+
+def make_resume_text(rng):
+    """Return the text of one synthetic resume: summary, skills, experience and education."""
+    years = rng.randint(1, 15)
+    lines = [f"{rng.choice(TITLES)} with {years} years of experience.", _sentence(rng, 20),
+             "Skills: " + ", ".join(_skills(rng, 3, 8)) + "."]
+    start = rng.randint(1998, 2020)
+    for _ in range(rng.randint(1, 4)):
+        end = min(start + rng.randint(1, 5), 2025)
+        lines.append(f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}, {start} - {end}.")
+        lines.extend(_sentence(rng) for _ in range(rng.randint(2, 5)))
+        start = end
+    lines.append(f"{rng.choice(DEGREES)}, {rng.choice(UNIVERSITIES)}, {rng.randint(1995, 2020)}.")
+    return "\n".join(lines)
+
+def make_resumes(count, seed=0):
+    rng = random.Random(seed)
+    return [make_resume_text(rng) for _ in range(count)]
+
+def resume_data(text):
+    """
+    Return parse_resume_text()-shaped data for a synthetic resume without running spaCy.
+
+    Lets the matching benchmarks run where no spaCy model is installed.
+    """
+    years = [int(y) for y in re.findall(r"(\d+)\s+years?", text.lower())]
+    return {"skills": [SKILLS[col] for col in find_skills(text)], "education": [], "education_level_score": 2,
+            "experience": [], "experience_years": max(years, default=0), "full_text": text}
+
+def make_job(rng, number):
+    title = f"{rng.choice(LEVELS)} {rng.choice(TITLES)}".strip()
+    description = " ".join([f"We are hiring a {title}.", "Requirements: " + ", ".join(_skills(rng)) + ".",
+                            f"{rng.randint(1, 10)} years of experience."] +
+                           [_sentence(rng) for _ in range(rng.randint(2, 6))])
+    return {"id": number + 1, "platform": "Synthetic", "title": title, "company": rng.choice(COMPANIES),
+            "location": rng.choice(LOCATIONS), "description": description,
+            "url": f"https://jobs.example.com/{number + 1}"}
+
+def make_jobs(count, seed=0):
+    """Return `count` job dictionaries shaped like database.load_jobs() rows."""
+    rng = random.Random(seed)
+    return [make_job(rng, number) for number in range(count)]
+
+def make_pdf(text):
+    """
+    Return a one-page PDF with the text, one line per text line.
+
+    Written by hand so the benchmarks need no PDF writing library.
+    """
+    lines = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in text.split("\n")]
+    stream = "BT /F1 10 Tf 50 750 Td 12 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+               "/Resources << /Font << /F1 5 0 R >> >> >>",
+               f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    out = "%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{o:010d} 00000 n \n" for o in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return out.encode("latin-1")
+
+# Card markup per platform, matching the selectors in job_scraper.PLATFORMS
+CARD_TEMPLATES = {
+    "Indeed": ('<div class="job_seen_beacon"><table><tr><td><h2 class="jobTitle"><a href="/rc/clk?jk={n}">'
+               '<span>{title}</span></a></h2><span class="companyName">{company}</span>'
+               '<div class="companyLocation">{location}</div><div class="job-snippet"><ul><li>{description}</li>'
+               '</ul></div></td></tr></table></div>'),
+    "Glassdoor": ('<li class="jl react-job-listing"><div class="jobHeader">{company}</div>'
+                  '<a class="jobLink" href="/partner/jobListing.htm?jobListingId={n}">{title}</a>'
+                  '<span class="subtle loc">{location}</span><div class="jobDescriptionContent">{description}</div>'
+                  '</li>'),
+    "LinkedIn": ('<li class="result-card job-result-card"><a class="result-card__full-card-link" '
+                 'href="https://www.linkedin.com/jobs/view/{n}"><span class="screen-reader-text">{title}</span></a>'
+                 '<h3 class="result-card__title">{title}</h3><h4 class="result-card__subtitle">{company}</h4>'
+                 '<span class="job-result-card__location">{location}</span></li>'),
+    "Freelancer": ('<div class="JobSearchCard-item"><div class="JobSearchCard-primary">'
+                   '<a class="JobSearchCard-primary-heading-link" href="/projects/python/{n}">{title}</a>'
+                   '<p class="JobSearchCard-primary-description">{description}</p></div>'
+                   '<div class="JobSearchCard-secondary">$250 - $750</div></div>'),
+    "Upwork": ('<section class="air-card-hover"><h4 class="job-title"><a href="https://www.upwork.com/jobs/~{n}">'
+               '{title}</a></h4><span class="break-word">{description}</span><small>Posted 2 hours ago</small>'
+               '</section>'),
+}
+
+# Next page link per platform, matching job_scraper.PLATFORMS[...]["next_page"], with its href
+NEXT_PAGE_LINKS = {
+    "Indeed": ('<a data-testid="pagination-page-next" aria-label="Next Page" href="{href}">Next</a>',
+               "/jobs?q=python&start=10"),
+    "Glassdoor": ('<a data-test="pagination-next" class="nextButton job-search-btn" href="{href}">Next</a>',
+                  "/Job/jobs.htm?sc.keyword=python&p=2"),
+    "LinkedIn": ('<a aria-label="Next" class="artdeco-pagination__button artdeco-pagination__button--next" '
+                 'href="{href}">Next</a>', "/jobs/search?keywords=python&start=25"),
+    "Freelancer": ('<a rel="prev" class="Pagination-item" href="/jobs/python/">Prev</a>'
+                   '<a rel="next" class="Pagination-item" href="{href}">Next</a>', "/jobs/python/2/"),
+    "Upwork": ('<a rel="nofollow next" class="up-pagination-item" href="{href}">Next</a>',
+               "/search/jobs/?q=python&page=2"),
+}
+
+# Description markup of a job's own page, matching job_scraper.PLATFORMS[...]["detail"]
+DETAIL_TEMPLATES = {
+    "Indeed": ('<div id="jobDescriptionText" class="jobsearch-jobDescriptionText jobsearch-JobComponent-description">'
+               '<p>{description}</p></div>'),
+    "Glassdoor": '<div class="jobDescriptionContent desc" data-test="jobDesc"><p>{description}</p></div>',
+    "LinkedIn": ('<div class="show-more-less-html__markup show-more-less-html__markup--clamp-after-5 '
+                 'relative overflow-hidden"><p>{description}</p></div>'),
+    "Freelancer": '<div class="PageProjectViewLogout-detail ng-star-inserted"><p>{description}</p></div>',
+    "Upwork": '<div data-test="Description" class="description text-body-sm"><p>{description}</p></div>',
+}
+
+def _page(platform, title, rng, content):
+    nav = "".join(f'<li><a href="/nav/{number}">{rng.choice(WORDS)}</a></li>' for number in range(40))
+    return (f"<!DOCTYPE html>\n<html><head><title>{title}</title>"
+            f"<script>window.__state = {{\"page\": 1}};</script><style>.x{{color:red}}</style></head>\n"
+            f"<body><header><nav><ul>{nav}</ul></nav></header>\n<main>\n{content}\n</main>\n"
+            f"<footer><p>{_sentence(rng, 30)}</p></footer></body></html>\n")
+
+def platform_page(platform, count=FIXTURE_CARDS, seed=0):
+    """Return a search result page of `platform` with `count` job cards and a next page link amid page chrome."""
+    rng = random.Random(f"{platform}-{seed}")
+    cards = "\n".join(CARD_TEMPLATES[platform].format(n=number, **make_job(rng, number)) for number in range(count))
+    template, href = NEXT_PAGE_LINKS[platform]
+    return _page(platform, f"{platform} jobs", rng, f"{cards}\n<nav>{template.format(href=href)}</nav>")
+
+def detail_page(platform, seed=0):
+    """
+    Return a job's own page on `platform`.
+
+    Returns:
+        tuple: (html, the job dictionary whose description the page shows).
+    """
+    rng = random.Random(f"{platform}-detail-{seed}")
+    job = make_job(rng, 0)
+    return _page(platform, job["title"], rng, DETAIL_TEMPLATES[platform].format(**job)), job
+
+def load_fixture(platform, kind=""):
+    """Return a stored fixture: the result page, or with kind="detail" the job page."""
+    name = f"{platform.lower()}_{kind}" if kind else platform.lower()
+    with open(os.path.join(FIXTURES_DIR, f"{name}.html"), "rb") as f:
+        return f.read()
+
+def write_fixtures():
+    from job_scraper import PLATFORMS
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for platform in PLATFORMS:
+        with open(os.path.join(FIXTURES_DIR, f"{platform.lower()}.html"), "w", encoding="utf-8", newline="\n") as f:
+            f.write(platform_page(platform))
+        with open(os.path.join(FIXTURES_DIR, f"{platform.lower()}_detail.html"), "w", encoding="utf-8",
+                  newline="\n") as f:
+            f.write(detail_page(platform)[0])
+
+if __name__ == "__main__":
+    write_fixtures()
@@ -0,0 +1,88 @@
+# bookmarks.py - Per-user bookmark lookups with an in-memory cache
+#
+# Every results page needs the user's bookmarked job ids. They are read from the
+# database once and kept in memory until the user toggles a bookmark (or, when
+# several server processes share the database, at most CACHE_TTL seconds).
+
+import threading
+import time
+from collections import OrderedDict
+
+import database
+
+# Seconds a cached bookmark set is trusted; bounds staleness across server processes
+CACHE_TTL = 60
+# Users whose bookmarks are kept in memory
+MAX_USERS = 10_000
+
+class BookmarkCache:
+    """
+    LRU cache of each user's bookmarked job ids, invalidated on toggle.
+
+    Every invalidation advances a clock, and the user's entry keeps the clock
+    value of their last invalidation, so a read that overlapped a toggle is not
+    cached. The markers live in the same bounded LRU as the sets.
+
+    Args:
+        ttl (float): Seconds before a cached set is read again from the database.
+        max_users (int): Users kept; the least recently used are dropped first.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, max_users=MAX_USERS):
+        self.ttl = ttl
+        self.max_users = max_users
+        # user_id -> (job ids or None after an invalidation, monotonic time cached, clock at last invalidation)
+        self._entries = OrderedDict()
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def job_ids(self, user_id):
+        """Return the user's bookmarked job ids as a frozenset."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] is not None and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(user_id)
+                return entry[0]
+            started = self._clock
+        job_ids = frozenset(database.bookmarked_job_ids(database.connect(), user_id))
+        with self._lock:
+            entry = self._entries.get(user_id)
+            # A toggle that happened while reading makes this read stale; don't cache it. Without an
+            # entry the user's marker may have been evicted, so any invalidation since counts.
+            if entry is not None:
+                fresh = entry[2] <= started
+            else:
+                fresh = self._clock == started
+            if fresh:
+                self._put(user_id, (job_ids, time.monotonic(), entry[2] if entry is not None else started))
+        return job_ids
+
+    def toggle(self, user_id, job_id):
+        """
+        Toggle a bookmark and drop the user's cached set.
+
+        Returns:
+            bool: True if the bookmark now exists.
+        """
+        active = database.toggle_bookmark(database.connect(), user_id, job_id)
+        self.invalidate(user_id)
+        return active
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._clock += 1
+            self._put(user_id, (None, 0.0, self._clock))
+
+    def _put(self, user_id, entry):
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+_cache = BookmarkCache()
+
+def job_ids(user_id):
+    return _cache.job_ids(user_id)
+
+def toggle(user_id, job_id):
+    return _cache.toggle(user_id, job_id)
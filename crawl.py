@@ -0,0 +1,202 @@
+# crawl.py - Deep crawl of the job boards: follow result pagination and fetch job pages
+#
+# A coordinator thread owns the frontier of pending pages, grouped by domain, and
+# hands tasks to a thread pool. At most `max_in_flight` tasks are outstanding and at
+# most `per_domain` run against one domain at a time. Progress is written to a
+# checkpoint file, so an interrupted crawl resumes where it stopped when it is run
+# again with the same queries, location, platforms and page limits.
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import job_scraper
+import metrics
+from job_scraper import HEADERS, PLATFORMS, parse_cards, parse_detail, parse_next_page, search_url
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PATH = "crawl_checkpoint.json"
+# Result pages followed per platform and query
+MAX_PAGES = 5
+WORKERS = 8
+PER_DOMAIN = 2
+MAX_IN_FLIGHT = 32
+# Completed tasks between two checkpoint writes
+CHECKPOINT_EVERY = 20
+
+class Crawler:
+    """
+    Crawl search results page by page and enrich each job from its detail page.
+
+    Args:
+        queries (list): Search queries.
+        location (str): Location filter for platforms that support it.
+        platforms (list): Keys of job_scraper.PLATFORMS, default all.
+        max_pages (int): Result pages to follow per platform and query.
+        fetch_details (bool): Fetch every job's own page for its full description.
+        workers (int): Threads fetching pages.
+        per_domain (int): Concurrent fetches per domain.
+        max_in_flight (int): Outstanding tasks handed to the pool at once.
+        checkpoint_path (str): Checkpoint file; None disables checkpointing.
+        fetcher (http_fetch.Fetcher): Fetch layer, default the scrapers' shared one.
+    """
+
+    def __init__(self, queries, location="", platforms=None, max_pages=MAX_PAGES, fetch_details=True,
+                 workers=WORKERS, per_domain=PER_DOMAIN, max_in_flight=MAX_IN_FLIGHT,
+                 checkpoint_path=CHECKPOINT_PATH, fetcher=None):
+        self.queries = list(queries)
+        self.location = location
+        self.platforms = list(platforms or PLATFORMS)
+        self.max_pages = max_pages
+        self.fetch_details = fetch_details
+        self.workers = workers
+        self.per_domain = per_domain
+        self.max_in_flight = max_in_flight
+        self.checkpoint_path = checkpoint_path
+        self.fetcher = fetcher or job_scraper.fetcher
+
+        self._frontier = {}
+        self._in_flight = {}
+        self._seen = set()
+        self._jobs = {}
+        self.failures = 0
+
+    def run(self):
+        """
+        Crawl until the frontier is empty.
+
+        Returns:
+            list: Job dictionaries, one per job URL.
+        """
+        if not self._load_checkpoint():
+            for platform in self.platforms:
+                for query in self.queries:
+                    url = search_url(platform, query, self.location)
+                    self._push({"kind": "search", "platform": platform, "url": url, "page": 1})
+
+        completed = 0
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crawler") as executor:
+            while True:
+                for task in self._ready_tasks(self.max_in_flight - len(running)):
+                    running[executor.submit(self._run_task, task)] = task
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    self._in_flight[task["domain"]] -= 1
+                    try:
+                        jobs, new_tasks = future.result()
+                    except Exception as e:
+                        self.failures += 1
+                        logger.warning("Crawling %s failed: %s", task["url"], e)
+                        # Keep what the result card had when its detail page can't be fetched
+                        jobs, new_tasks = ([task["job"]] if task["kind"] == "detail" else []), []
+                    for job in jobs:
+                        self._jobs[job["url"]] = job
+                    for new_task in new_tasks:
+                        if new_task["url"] not in self._jobs:
+                            self._push(new_task)
+                    completed += 1
+                    if completed % CHECKPOINT_EVERY == 0:
+                        self._save_checkpoint(running.values())
+
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        logger.info("Crawl finished: %d jobs, %d pages, %d failures", len(self._jobs), completed, self.failures)
+        return list(self._jobs.values())
+
+    def _push(self, task):
+        if task["url"] in self._seen:
+            return
+        self._seen.add(task["url"])
+        task["domain"] = urlparse(task["url"]).netloc
+        self._frontier.setdefault(task["domain"], deque()).append(task)
+
+    def _ready_tasks(self, capacity):
+        # Round-robin over domains that are below their concurrency limit
+        tasks = []
+        while capacity > 0:
+            picked = False
+            for domain, pending in self._frontier.items():
+                if capacity > 0 and pending and self._in_flight.get(domain, 0) < self.per_domain:
+                    tasks.append(pending.popleft())
+                    self._in_flight[domain] = self._in_flight.get(domain, 0) + 1
+                    capacity -= 1
+                    picked = True
+            if not picked:
+                break
+        return tasks
+
+    def _run_task(self, task):
+        """
+        Fetch and parse one page. Runs on a pool thread and leaves crawler state to the coordinator.
+
+        Returns:
+            tuple: (finished jobs, follow-up tasks)
+        """
+        with metrics.timed(f"crawl_{task['kind']}"):
+            r = self.fetcher.fetch(task["url"], headers=HEADERS)
+        # Counted as a failed page rather than parsed as one without jobs
+        r.raise_for_status()
+        platform = task["platform"]
+        if task["kind"] == "detail":
+            return [dict(task["job"], **parse_detail(r.content, platform))], []
+
+        jobs = []
+        new_tasks = []
+        for job in parse_cards(r.content, platform, limit=None):
+            if self.fetch_details and PLATFORMS[platform].get("detail"):
+                new_tasks.append({"kind": "detail", "platform": platform, "url": job["url"], "job": job})
+            else:
+                jobs.append(job)
+        if task["page"] < self.max_pages:
+            next_url = parse_next_page(r.content, platform, task["url"])
+            if next_url:
+                new_tasks.append({"kind": "search", "platform": platform, "url": next_url, "page": task["page"] + 1})
+        return jobs, new_tasks
+
+    def _save_checkpoint(self, running):
+        if not self.checkpoint_path:
+            return
+        # Tasks still running are saved as pending; they are simply redone on resume
+        pending = list(running) + [task for tasks in self._frontier.values() for task in tasks]
+        state = {"saved_at": time.time(), "params": self._params(), "pending": pending, "seen": sorted(self._seen),
+                 "jobs": list(self._jobs.values()), "failures": self.failures}
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _params(self):
+        # What the crawl covers; a checkpoint is only resumed by a crawl with the same parameters
+        return {"queries": self.queries, "location": self.location, "platforms": self.platforms,
+                "max_pages": self.max_pages, "fetch_details": self.fetch_details}
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+        with open(self.checkpoint_path) as f:
+            state = json.load(f)
+        if state.get("params") != self._params():
+            logger.warning("Ignoring %s: it was saved by a crawl with other parameters (%s); starting afresh",
+                           self.checkpoint_path, state.get("params"))
+            return False
+        self._seen = set(state["seen"])
+        self._jobs = {job["url"]: job for job in state["jobs"]}
+        self.failures = state.get("failures", 0)
+        for task in state["pending"]:
+            self._frontier.setdefault(task["domain"], deque()).append(task)
+        logger.info("Resuming crawl from %s: %d pending pages, %d jobs",
+                    self.checkpoint_path, len(state["pending"]), len(self._jobs))
+        return True
+
+def crawl_jobs(queries, location="", **kwargs):
+    """Run a Crawler over the queries and return the jobs found."""
+    return Crawler(queries, location, **kwargs).run()
@@ -0,0 +1,240 @@
+# database.py - SQLite data access shared by the web app and the ingestion worker
+#
+# Each thread keeps one open connection per database file and reuses it, so
+# requests don't pay for connect and pragma setup, and sqlite3's per-connection
+# statement cache keeps the queries below prepared. The database runs in WAL mode
+# so readers are not blocked by the ingestion worker's writes.
+
+import sqlite3
+import threading
+import time
+
+DB_PATH = "jobs.db"
+
+# Applied to every new connection
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",  # durable across application crashes, fsync at checkpoints only
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -16000",  # 16 MB page cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+]
+# Prepared statements kept per connection
+STATEMENT_CACHE_SIZE = 256
+
+SQL_INSERT_USER = "INSERT INTO users (username, password_hash) VALUES (?, ?)"
+SQL_SELECT_USER = "SELECT id, password_hash FROM users WHERE username = ?"
+SQL_SELECT_BOOKMARKS = "SELECT job_id FROM bookmarks WHERE user_id = ? AND active = 1"
+# Bookmark rows are kept and flipped, so a toggle is one statement whatever the current state
+SQL_TOGGLE_BOOKMARK = '''INSERT INTO bookmarks (user_id, job_id, active) VALUES (?, ?, 1)
+                         ON CONFLICT(user_id, job_id) DO UPDATE SET active = 1 - active
+                         RETURNING active'''
+
+# Bulk job upserts go through a per-connection temporary staging table
+SQL_CREATE_INCOMING = '''CREATE TEMP TABLE IF NOT EXISTS incoming_jobs
+                         (platform TEXT, title TEXT, company TEXT, location TEXT, description TEXT,
+                          url TEXT PRIMARY KEY, fetched_at REAL, expires_at REAL)'''
+SQL_INSERT_INCOMING = '''INSERT INTO temp.incoming_jobs
+                         (platform, title, company, location, description, url, fetched_at, expires_at)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+SQL_CLASSIFY_INCOMING = '''SELECT SUM(j.id IS NULL),
+                                SUM(j.id IS NOT NULL AND (j.platform IS NOT i.platform OR j.title IS NOT i.title
+                                    OR j.company IS NOT i.company OR j.location IS NOT i.location
+                                    OR j.description IS NOT i.description))
+                           FROM temp.incoming_jobs i LEFT JOIN jobs j ON j.url = i.url'''
+SQL_MERGE_INCOMING = '''INSERT INTO jobs (platform, title, company, location, description, url, fetched_at, expires_at)
+                        SELECT platform, title, company, location, description, url, fetched_at, expires_at
+                        FROM temp.incoming_jobs WHERE true
+                        ON CONFLICT(url) DO UPDATE SET
+                            platform = excluded.platform, title = excluded.title, company = excluded.company,
+                            location = excluded.location, description = excluded.description,
+                            fetched_at = excluded.fetched_at, expires_at = excluded.expires_at,
+                            -- Changed content needs a new near-duplicate signature (see dedup.py)
+                            minhash = CASE WHEN jobs.title IS excluded.title AND jobs.company IS excluded.company
+                                           AND jobs.description IS excluded.description
+                                           THEN jobs.minhash END'''
+
+# Columns added to the jobs table after the first release; migrated in place by init_db()
+JOB_COLUMNS = {
+    "platform": "TEXT",
+    "fetched_at": "REAL",
+    "expires_at": "REAL",
+    "minhash": "BLOB",
+    "cluster_id": "INTEGER",
+}
+
+_local = threading.local()
+
+def get_connection(path=None):
+    """
+    Return this thread's pooled connection to the database at `path` (default DB_PATH).
+
+    The connection stays open for the life of the thread. Use it as a context
+    manager (`with get_connection() as conn:`) to commit or roll back a transaction.
+    """
+    path = path or DB_PATH
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=5, cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        connections[path] = conn
+    return conn
+
+def connect():
+    return get_connection(DB_PATH)
+
+def close_connections():
+    """Close the calling thread's pooled connections."""
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
+
+def init_db():
+    with connect() as conn:
+        c = conn.cursor()
+        # Create users table
+        c.execute('''CREATE TABLE IF NOT EXISTS users
+                     (id INTEGER PRIMARY KEY, username TEXT UNIQUE, password_hash TEXT)''')
+        # Create jobs table
+        c.execute('''CREATE TABLE IF NOT EXISTS jobs
+                     (id INTEGER PRIMARY KEY, title TEXT, company TEXT, location TEXT, description TEXT, url TEXT,
+                      platform TEXT, fetched_at REAL, expires_at REAL, minhash BLOB, cluster_id INTEGER)''')
+        # Create bookmarks table
+        c.execute('''CREATE TABLE IF NOT EXISTS bookmarks
+                     (user_id INTEGER, job_id INTEGER, active INTEGER NOT NULL DEFAULT 1,
+                      PRIMARY KEY (user_id, job_id),
+                      FOREIGN KEY (user_id) REFERENCES users(id),
+                      FOREIGN KEY (job_id) REFERENCES jobs(id))''')
+        # LSH buckets of the job signatures, for near-duplicate lookups (see dedup.py)
+        c.execute('''CREATE TABLE IF NOT EXISTS job_lsh
+                     (band INTEGER, bucket INTEGER, job_id INTEGER)''')
+        _migrate_jobs_table(c)
+        if "active" not in {row[1] for row in c.execute("PRAGMA table_info(bookmarks)")}:
+            c.execute("ALTER TABLE bookmarks ADD COLUMN active INTEGER NOT NULL DEFAULT 1")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_expires_at ON jobs(expires_at)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_cluster ON jobs(cluster_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_unsigned ON jobs(id) WHERE minhash IS NULL")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_job_lsh_bucket ON job_lsh(band, bucket)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_job_lsh_job ON job_lsh(job_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_bookmarks_user ON bookmarks(user_id)")
+        conn.commit()
+
+def _migrate_jobs_table(c):
+    existing = {row[1] for row in c.execute("PRAGMA table_info(jobs)")}
+    for column, column_type in JOB_COLUMNS.items():
+        if column not in existing:
+            c.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+    # Jobs are upserted by URL, so older databases must be deduplicated before the unique index exists
+    c.execute("DELETE FROM jobs WHERE id NOT IN (SELECT MIN(id) FROM jobs GROUP BY url)")
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_url ON jobs(url)")
+
+def create_user(conn, username, password_hash):
+    """Insert a user; raises sqlite3.IntegrityError when the username is taken."""
+    with conn:
+        conn.execute(SQL_INSERT_USER, (username, password_hash))
+
+def get_user(conn, username):
+    """Return (id, password_hash) for a username, or None."""
+    return conn.execute(SQL_SELECT_USER, (username,)).fetchone()
+
+def bookmarked_job_ids(conn, user_id):
+    return set(row[0] for row in conn.execute(SQL_SELECT_BOOKMARKS, (user_id,)))
+
+def toggle_bookmark(conn, user_id, job_id):
+    """
+    Add the bookmark if it doesn't exist, remove it otherwise, in a single statement.
+
+    Returns:
+        bool: True if the bookmark now exists.
+    """
+    with conn:
+        return bool(conn.execute(SQL_TOGGLE_BOOKMARK, (user_id, job_id)).fetchone()[0])
+
+def upsert_jobs(conn, jobs, ttl, now=None):
+    """
+    Bulk insert new jobs and refresh existing ones, keyed on URL, in one transaction.
+
+    The batch is loaded into a temporary table with executemany, then classified
+    and merged into jobs with set-based statements. Existing rows keep their id,
+    so bookmarks stay attached across refreshes; every job in the batch gets new
+    fetched_at/expires_at timestamps.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+        jobs (list): Job dictionaries as returned by the scrapers. For repeated URLs the last one wins.
+        ttl (float): Seconds until a job expires unless it is fetched again.
+        now (float): Fetch timestamp, defaults to the current time.
+
+    Returns:
+        dict: Counts of 'inserted', 'updated' (content changed) and 'unchanged' jobs.
+    """
+    now = time.time() if now is None else now
+    rows = {
+        job["url"]: (job.get("platform", ""), job["title"], job["company"], job["location"], job["description"],
+                     job["url"], now, now + ttl)
+        for job in jobs
+    }
+    with conn:
+        conn.execute(SQL_CREATE_INCOMING)
+        conn.execute("DELETE FROM temp.incoming_jobs")
+        conn.executemany(SQL_INSERT_INCOMING, rows.values())
+        inserted, updated = conn.execute(SQL_CLASSIFY_INCOMING).fetchone()
+        conn.execute(SQL_MERGE_INCOMING)
+        conn.execute("DELETE FROM temp.incoming_jobs")
+    inserted = inserted or 0
+    updated = updated or 0
+    return {"inserted": inserted, "updated": updated, "unchanged": len(rows) - inserted - updated}
+
+def expire_jobs(conn, now=None):
+    """
+    Delete jobs past their expiry time, or never stamped with one. Bookmarked jobs are kept so bookmarks never dangle.
+
+    Returns:
+        int: Number of jobs deleted.
+    """
+    now = time.time() if now is None else now
+    c = conn.execute(
+        '''DELETE FROM jobs WHERE (expires_at IS NULL OR expires_at < ?)
+           AND id NOT IN (SELECT job_id FROM bookmarks WHERE active = 1)''', (now,))
+    # Removed bookmarks of deleted jobs
+    conn.execute("DELETE FROM bookmarks WHERE active = 0 AND job_id NOT IN (SELECT id FROM jobs)")
+    conn.commit()
+    return c.rowcount
+
+def corpus_version(conn):
+    """Fingerprint of the jobs table; changes whenever jobs are added, refreshed or removed."""
+    count, max_id, last_fetched = conn.execute("SELECT COUNT(*), MAX(id), MAX(fetched_at) FROM jobs").fetchone()
+    return f"{count}:{max_id}:{last_fetched}"
+
+def load_jobs(conn, now=None, include_duplicates=False):
+    """
+    Read the current (non-expired) job corpus.
+
+    Near-duplicates of another job (see dedup.py) are left out unless asked for,
+    so each posting is indexed and scored once. The canonical job is the oldest
+    member of its cluster; when it has expired (and is only kept because it is
+    bookmarked), the oldest live duplicate stands in for it.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+        now (float): Jobs expiring before this time are left out, defaults to the current time.
+        include_duplicates (bool): Also return jobs clustered under another job.
+
+    Returns:
+        list: Job dictionaries including their database 'id'.
+    """
+    now = time.time() if now is None else now
+    c = conn.execute(
+        '''SELECT id, platform, title, company, location, description, url FROM jobs
+           WHERE (expires_at IS NULL OR expires_at >= :now)
+           AND (:include_duplicates OR cluster_id IS NULL OR cluster_id = id
+                OR id = (SELECT MIN(m.id) FROM jobs m WHERE m.cluster_id = jobs.cluster_id
+                         AND (m.expires_at IS NULL OR m.expires_at >= :now)))
+           ORDER BY id''', {"now": now, "include_duplicates": include_duplicates})
+    columns = [d[0] for d in c.description]
+    return [dict(zip(columns, row)) for row in c.fetchall()]
@@ -0,0 +1,141 @@
+# dedup.py - Near-duplicate job detection with MinHash signatures and LSH buckets
+#
+# The same posting is often syndicated to several boards under different URLs.
+# At ingestion every new or changed job gets a MinHash signature over the word
+# shingles of its title, company and description. The signature is split into
+# bands and each band is hashed to a bucket in the job_lsh table, so likely
+# duplicates are found with an indexed bucket lookup instead of a scan of the
+# corpus. Candidates whose estimated Jaccard similarity reaches THRESHOLD join the
+# cluster of the oldest job they match; cluster_id points to that canonical job.
+
+import hashlib
+import logging
+import re
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+# BANDS * ROWS == NUM_PERM; 16 bands of 8 rows make pairs above ~0.7 similarity likely candidates
+BANDS = 16
+ROWS = 8
+# Estimated Jaccard similarity at which a candidate counts as a duplicate
+THRESHOLD = 0.8
+# Words per shingle
+SHINGLE_SIZE = 3
+
+_PRIME = 4294967311  # smallest prime above 2**32
+_rng = np.random.RandomState(1)
+# Fixed permutations, so signatures stored by earlier runs stay comparable
+_A = _rng.randint(1, 1 << 31, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 1 << 31, size=NUM_PERM).astype(np.uint64)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Return the set of `size`-word shingles of the text, lowercased."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def signature(text):
+    """
+    Return the MinHash signature of a text.
+
+    Returns:
+        numpy.ndarray or None: NUM_PERM uint32 values, or None for a text without words.
+    """
+    hashed = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text)), dtype=np.uint64)
+    if len(hashed) == 0:
+        return None
+    permuted = (_A[:, None] * hashed[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+def band_buckets(sig):
+    """Bucket of each band of a signature, as (band, bucket) pairs."""
+    buckets = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(sig[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "little", signed=True)))
+    return buckets
+
+def similarity(sig, other):
+    """Estimated Jaccard similarity: the share of equal signature positions."""
+    return float(np.count_nonzero(sig == other)) / NUM_PERM
+
+def job_text(job):
+    return " ".join(job.get(field) or "" for field in ("title", "company", "description"))
+
+def update_clusters(conn):
+    """
+    Sign the jobs that have no signature yet and assign each one to a cluster.
+
+    Jobs are processed in id order, so within a cluster the oldest job is the
+    canonical one. Clusters whose canonical job was deleted are handed to their
+    oldest remaining member.
+
+    Args:
+        conn (sqlite3.Connection): Open database connection.
+
+    Returns:
+        dict: Number of jobs 'signed' and how many of them were 'duplicates'.
+    """
+    with conn:
+        # Forget buckets of deleted jobs and re-home clusters that lost their canonical job
+        conn.execute("DELETE FROM job_lsh WHERE job_id NOT IN (SELECT id FROM jobs)")
+        conn.execute('''UPDATE jobs SET cluster_id = (SELECT MIN(j.id) FROM jobs j WHERE j.cluster_id = jobs.cluster_id)
+                        WHERE cluster_id IS NOT NULL AND cluster_id NOT IN (SELECT id FROM jobs)''')
+
+        # Members of a cluster whose canonical job changed are clustered again along with it
+        conn.execute('''UPDATE jobs SET minhash = NULL
+                        WHERE cluster_id IN (SELECT id FROM jobs WHERE minhash IS NULL)''')
+        pending = conn.execute('''SELECT id, title, company, description FROM jobs
+                                  WHERE minhash IS NULL ORDER BY id''').fetchall()
+        if not pending:
+            return {"signed": 0, "duplicates": 0}
+        conn.execute("DELETE FROM job_lsh WHERE job_id IN (SELECT id FROM jobs WHERE minhash IS NULL)")
+
+        signatures = {}
+        for job_id, title, company, description in pending:
+            signatures[job_id] = signature(job_text({"title": title, "company": company, "description": description}))
+        conn.executemany("INSERT INTO job_lsh (band, bucket, job_id) VALUES (?, ?, ?)",
+                         [(band, bucket, job_id) for job_id, sig in signatures.items() if sig is not None
+                          for band, bucket in band_buckets(sig)])
+
+        # Every job sharing a bucket with a pending job, found through the (band, bucket) index
+        candidates = {}
+        for job_id, candidate_id, candidate_cluster, candidate_sig in conn.execute(
+                '''SELECT DISTINCT p.job_id, j.id, j.cluster_id, j.minhash
+                   FROM job_lsh p
+                   JOIN job_lsh l ON l.band = p.band AND l.bucket = p.bucket AND l.job_id != p.job_id
+                   JOIN jobs j ON j.id = l.job_id
+                   WHERE p.job_id IN (SELECT id FROM jobs WHERE minhash IS NULL)'''):
+            candidates.setdefault(job_id, []).append((candidate_id, candidate_cluster, candidate_sig))
+
+        clusters = {}
+        duplicates = 0
+        for job_id, sig in signatures.items():
+            cluster_id = job_id
+            for candidate_id, candidate_cluster, candidate_sig in candidates.get(job_id, []):
+                if candidate_id in signatures:
+                    # Pending as well: only jobs already clustered in this run can be joined
+                    if candidate_id not in clusters:
+                        continue
+                    candidate_cluster = clusters[candidate_id]
+                    candidate_sig = signatures[candidate_id]
+                else:
+                    candidate_cluster = candidate_cluster if candidate_cluster is not None else candidate_id
+                    candidate_sig = np.frombuffer(candidate_sig, dtype=np.uint32)
+                if candidate_cluster < cluster_id and similarity(sig, candidate_sig) >= THRESHOLD:
+                    cluster_id = candidate_cluster
+            clusters[job_id] = cluster_id
+            if cluster_id != job_id:
+                duplicates += 1
+        conn.executemany("UPDATE jobs SET minhash = ?, cluster_id = ? WHERE id = ?",
+                         [(b"" if sig is None else sig.tobytes(), clusters[job_id], job_id)
+                          for job_id, sig in signatures.items()])
+    logger.info("Signed %d jobs, %d near-duplicates", len(pending), duplicates)
+    return {"signed": len(pending), "duplicates": duplicates}
@@ -0,0 +1,257 @@
+# http_fetch.py - Shared HTTP fetch layer for the scrapers
+#
+# Requests go through keep-alive sessions pooled per host, are retried with
+# exponential backoff, and are spaced out per host. Successful responses are kept
+# in an on-disk cache: within CACHE_TTL they are served without a request, after
+# that they are revalidated with If-None-Match / If-Modified-Since. Entries not
+# fetched or revalidated for CACHE_MAX_AGE are pruned from the cache directory.
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "http_cache"
+# Seconds a cached response is served without revalidation
+CACHE_TTL = 15 * 60
+# Seconds a cached response is kept on disk (as a stale fallback) after it was last fetched or revalidated
+CACHE_MAX_AGE = 7 * 24 * 60 * 60
+# Seconds between two prunes of the cache directory
+PRUNE_INTERVAL = 60 * 60
+# Seconds to wait for a single HTTP response
+REQUEST_TIMEOUT = 10
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Keep-alive connections kept per host
+POOL_SIZE = 10
+# Minimum spacing between two requests to the same host
+HOST_MIN_INTERVAL = 1.0
+
+class HostRateLimiter:
+    """
+    Space out requests per host instead of sleeping globally between platforms.
+
+    Each host gets its own schedule, so requests to different hosts proceed in
+    parallel while requests to the same host stay at least `min_interval` apart.
+    """
+
+    def __init__(self, min_interval=HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+class FetchResponse:
+    """The parts of a response the scrapers use, whether it came from the network or the cache."""
+
+    def __init__(self, url, status_code, content, encoding=None, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def raise_for_status(self):
+        """Raise requests.HTTPError for a 4xx or 5xx status."""
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} response for {self.url}")
+
+class Fetcher:
+    """
+    GET pages through pooled sessions with retries, rate limiting and a response cache.
+
+    Args:
+        cache_dir (str): Directory for cached responses; None disables the cache.
+        ttl (float): Seconds a cached response is served without a request.
+        max_age (float): Seconds a cached response is kept after it was last fetched.
+        timeout (float): Seconds to wait for each response.
+        retries (int): Retries for connection errors and RETRY_STATUSES.
+        backoff_factor (float): Base of the exponential backoff between retries.
+        rate_limiter (HostRateLimiter): Per-host spacing; None to disable.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL, timeout=REQUEST_TIMEOUT, retries=RETRIES,
+                 backoff_factor=BACKOFF_FACTOR, rate_limiter=None, max_age=CACHE_MAX_AGE):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_age = max_age
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = rate_limiter
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def session_for(self, url):
+        """Return the keep-alive session for the URL's host, creating it on first use."""
+        host = urlparse(url).netloc
+        with self._sessions_lock:
+            session = self._sessions.get(host)
+            if session is None:
+                retry = Retry(total=self.retries, backoff_factor=self.backoff_factor,
+                              status_forcelist=RETRY_STATUSES, allowed_methods=["GET"],
+                              respect_retry_after_header=True, raise_on_status=False)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def fetch(self, url, headers=None):
+        """
+        GET a URL, from the cache when fresh and with a conditional request when stale.
+
+        If the request fails, or still answers with an error status after the retries
+        (e.g. 429 or 503), and a stale cached copy exists, the stale copy is returned.
+
+        Returns:
+            FetchResponse: The response; `from_cache` tells whether the body came from the cache.
+        """
+        entry = self._load(url)
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+            return self._cached_response(url, entry)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        try:
+            r = self.session_for(url).get(url, headers=request_headers, timeout=self.timeout)
+        except requests.RequestException:
+            if entry is None:
+                raise
+            logger.warning("Fetching %s failed, serving stale cached copy", url)
+            return self._cached_response(url, entry)
+
+        if r.status_code == 304 and entry is not None:
+            entry["fetched_at"] = time.time()
+            self._store_meta(url, entry)
+            return self._cached_response(url, entry)
+        if r.status_code >= 400 and entry is not None:
+            logger.warning("Fetching %s answered %d, serving stale cached copy", url, r.status_code)
+            return self._cached_response(url, entry)
+
+        response = FetchResponse(url, r.status_code, r.content, r.encoding)
+        if r.status_code == 200:
+            self._store(url, r)
+        return response
+
+    def prune(self, max_age=None):
+        """
+        Delete cached responses not fetched or revalidated for `max_age` seconds.
+
+        Every write of an entry's metadata refreshes its modification time, so the
+        age is read from the file system without opening the entries.
+
+        Returns:
+            int: Number of responses deleted.
+        """
+        if not self.cache_dir:
+            return 0
+        cutoff = time.time() - (self.max_age if max_age is None else max_age)
+        removed = 0
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return 0
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                if name.endswith(".json"):
+                    # Metadata first, so a concurrent reader never finds metadata without its body
+                    os.remove(path)
+                    body = path[:-len(".json")] + ".body"
+                    if os.path.exists(body):
+                        os.remove(body)
+                    removed += 1
+                elif name.endswith(".tmp") or (name.endswith(".body")
+                                               and not os.path.exists(path[:-len(".body")] + ".json")):
+                    # Leftovers of interrupted writes
+                    os.remove(path)
+            except OSError:
+                continue
+        if removed:
+            logger.info("Pruned %d cached responses from %s", removed, self.cache_dir)
+        return removed
+
+    def _maybe_prune(self):
+        now = time.monotonic()
+        with self._prune_lock:
+            if self._last_prune and now - self._last_prune < PRUNE_INTERVAL:
+                return
+            self._last_prune = now
+        self.prune()
+
+    def _cached_response(self, url, entry):
+        with open(self._path(url, ".body"), "rb") as f:
+            content = f.read()
+        return FetchResponse(url, entry["status_code"], content, entry.get("encoding"), from_cache=True)
+
+    def _path(self, url, suffix):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + suffix)
+
+    def _load(self, url):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(url, ".json")) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if os.path.exists(self._path(url, ".body")) else None
+
+    def _store(self, url, r):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _write_atomic(self._path(url, ".body"), r.content)
+        self._store_meta(url, {"url": url, "status_code": r.status_code, "encoding": r.encoding,
+                               "etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified"),
+                               "fetched_at": time.time()})
+        self._maybe_prune()
+
+    def _store_meta(self, url, entry):
+        _write_atomic(self._path(url, ".json"), json.dumps(entry).encode("utf-8"))
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,114 @@
+# ingest.py - Refresh the jobs table from the job boards, outside of the upload request
+#
+# Run once:            python ingest.py
+# Run on a schedule:   python ingest.py --interval 3600
+# Deep crawl:          python ingest.py --crawl --max-pages 10
+
+import argparse
+import logging
+import time
+
+import crawl
+import database
+import dedup
+import job_index
+import metrics
+from job_scraper import scrape_jobs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERIES = ["software engineer"]
+DEFAULT_LOCATION = "Remote"
+# Jobs not seen again within this many seconds are expired
+JOB_TTL = 3 * 24 * 3600
+
+def ingest_jobs(queries=None, location=DEFAULT_LOCATION, ttl=JOB_TTL, rebuild_index=False, deep_crawl=False,
+                max_pages=crawl.MAX_PAGES):
+    """
+    Scrape every query once, upsert the results and expire stale jobs.
+
+    By default only the first result page of each platform is read. With
+    `deep_crawl`, result pagination is followed and every job's own page is
+    fetched for its full description (see crawl.py).
+
+    Args:
+        queries (list): Search queries to scrape, defaults to DEFAULT_QUERIES.
+        location (str): Location filter passed to the scrapers.
+        ttl (float): Seconds a fetched job stays valid.
+        rebuild_index (bool): Refit the TF-IDF job index instead of updating it incrementally.
+        deep_crawl (bool): Crawl result pagination and job pages instead of the first result page.
+        max_pages (int): Result pages followed per platform and query when crawling.
+
+    Returns:
+        dict: Counts of scraped, inserted, updated, unchanged, expired and near-duplicate jobs, and the job index version.
+    """
+    queries = queries or DEFAULT_QUERIES
+    if deep_crawl:
+        # The crawler already returns one job per URL
+        jobs = crawl.crawl_jobs(queries, location, max_pages=max_pages)
+    else:
+        jobs = []
+        seen_urls = set()
+        for query in queries:
+            for job in scrape_jobs(query, location=location):
+                # Remove duplicate jobs by URL
+                if job["url"] not in seen_urls:
+                    jobs.append(job)
+                    seen_urls.add(job["url"])
+
+    with database.connect() as conn:
+        with metrics.timed("db_write"):
+            stats = database.upsert_jobs(conn, jobs, ttl)
+            expired = database.expire_jobs(conn)
+        with metrics.timed("dedup"):
+            clusters = dedup.update_clusters(conn)
+        corpus = database.load_jobs(conn)
+    with metrics.timed("index_refresh"):
+        index = job_index.refresh_index(corpus, rebuild=rebuild_index)
+    summary = {"scraped": len(jobs), **stats, "expired": expired, "duplicates": clusters["duplicates"],
+               "index_version": index.version}
+    logger.info("Ingestion finished: %s", summary)
+    for stage, timing in metrics.snapshot().items():
+        logger.info("Stage %s: %d calls, p50 %.3fs, p95 %.3fs, p99 %.3fs", stage, timing["count"],
+                    *timing["quantiles"].values())
+    return summary
+
+def run_forever(interval, **kwargs):
+    while True:
+        started = time.monotonic()
+        try:
+            ingest_jobs(**kwargs)
+        except Exception:
+            logger.exception("Ingestion run failed")
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh the jobs table from the job boards.")
+    parser.add_argument("--query", action="append", dest="queries",
+                        help="Search query to scrape (repeatable, default: %s)" % DEFAULT_QUERIES[0])
+    parser.add_argument("--location", default=DEFAULT_LOCATION)
+    parser.add_argument("--ttl", type=float, default=JOB_TTL, help="Seconds until an unseen job expires")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Refit the TF-IDF job index from scratch on the first run")
+    parser.add_argument("--crawl", action="store_true",
+                        help="Follow result pagination and fetch job pages (resumes from crawl_checkpoint.json)")
+    parser.add_argument("--max-pages", type=int, default=crawl.MAX_PAGES,
+                        help="Result pages per platform and query when crawling")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="Repeat every N seconds; 0 runs a single refresh")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    database.init_db()
+    kwargs = {"queries": args.queries, "location": args.location, "ttl": args.ttl,
+              "deep_crawl": args.crawl, "max_pages": args.max_pages}
+    if args.interval > 0:
+        if args.rebuild_index:
+            ingest_jobs(rebuild_index=True, **kwargs)
+            time.sleep(args.interval)
+        run_forever(args.interval, **kwargs)
+    else:
+        ingest_jobs(rebuild_index=args.rebuild_index, **kwargs)
+
+if __name__ == "__main__":
+    main()
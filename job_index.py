@@ -0,0 +1,350 @@
+# job_index.py - Persistent TF-IDF index over the ingested job corpus
+#
+# The vectorizer is fitted once over the jobs table and the job vectors are stored
+# on disk as raw CSR arrays, so the web app memory-maps them and only transforms the
+# resume at query time. Each save goes to a new version directory and the CURRENT
+# file is switched atomically, so readers never see a half-written index.
+#
+# Alongside the row-major job vectors the index keeps an inverted (term -> jobs)
+# copy in CSC form, used to score only the jobs that share a term with the resume,
+# and a job x skill presence matrix over the shared skill vocabulary (skills.py).
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+
+from skills import SKILLS, TAXONOMY_VERSION, skill_presence_matrix
+
+INDEX_DIR = "job_index"
+# Refit the vocabulary and IDF weights once this share of rows changed since the last fit
+REFIT_THRESHOLD = 0.2
+# Bumped whenever the on-disk layout changes; older indexes are rebuilt instead of loaded
+FORMAT_VERSION = 3
+
+def _text_hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+class JobIndex:
+    """
+    TF-IDF vectors and skill presence for every job, aligned with their database ids.
+
+    Rows are L2-normalized by the vectorizer, so a dot product with a transformed
+    resume is the cosine similarity.
+    """
+
+    def __init__(self, vectorizer, matrix, job_ids, job_hashes, version=0, fitted_rows=0, changed_rows=0,
+                 inverted=None, skill_matrix=None, skills=SKILLS, taxonomy=TAXONOMY_VERSION):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self._inverted = inverted
+        self.skill_matrix = skill_matrix
+        self._skill_postings = None
+        self.skills = list(skills)
+        self.taxonomy = taxonomy
+        self._skill_col = {skill: col for col, skill in enumerate(self.skills)}
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        self.job_hashes = np.asarray(job_hashes, dtype=np.int64)
+        self.version = version
+        self.fitted_rows = fitted_rows
+        self.changed_rows = changed_rows
+        self._row_of = {int(job_id): row for row, job_id in enumerate(self.job_ids)}
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    @property
+    def inverted(self):
+        """Term -> job postings: the job matrix in CSC form, so each column lists the jobs containing a term."""
+        if self._inverted is None:
+            self._inverted = self.matrix.tocsc()
+        return self._inverted
+
+    @classmethod
+    def build(cls, jobs, version=0):
+        """
+        Fit a new vectorizer over the job descriptions.
+
+        Args:
+            jobs (list): Job dictionaries with 'id' and 'description'.
+            version (int): Version number to give the new index.
+
+        Returns:
+            JobIndex: The fitted index.
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        descriptions = [job.get("description", "") or "" for job in jobs]
+        vectorizer = TfidfVectorizer(stop_words='english')
+        try:
+            matrix = vectorizer.fit_transform(descriptions).tocsr()
+        except ValueError:
+            # Empty vocabulary: keep the rows so the index still lines up with the jobs
+            vectorizer = None
+            matrix = sp.csr_matrix((len(jobs), 0), dtype=np.float64)
+        return cls(vectorizer, matrix,
+                   [job["id"] for job in jobs],
+                   [_text_hash(text) for text in descriptions],
+                   version=version, fitted_rows=len(jobs),
+                   skill_matrix=skill_presence_matrix(descriptions))
+
+    def transform(self, texts):
+        if self.vectorizer is None:
+            return sp.csr_matrix((len(texts), 0), dtype=np.float64)
+        return self.vectorizer.transform(texts).tocsr()
+
+    def update(self, jobs):
+        """
+        Bring the index in line with the current job corpus.
+
+        New and changed jobs are transformed with the existing vocabulary and expired
+        jobs are dropped. Once more than REFIT_THRESHOLD of the rows changed since the
+        last fit, the whole index is refitted so IDF weights track the corpus.
+
+        Args:
+            jobs (list): The full current corpus, job dictionaries with 'id' and 'description'.
+
+        Returns:
+            JobIndex: self when nothing changed, otherwise a new index with a bumped version.
+        """
+        current = {job["id"]: job for job in jobs}
+        hashes = {job_id: _text_hash(job.get("description", "") or "") for job_id, job in current.items()}
+
+        keep_rows = [row for row, (job_id, job_hash) in enumerate(zip(self.job_ids, self.job_hashes))
+                     if hashes.get(int(job_id)) == job_hash]
+        kept_ids = {int(self.job_ids[row]) for row in keep_rows}
+        added = [job for job_id, job in current.items() if job_id not in kept_ids]
+        removed = len(self.job_ids) - len(keep_rows)
+        skills_changed = self.skills != SKILLS or self.taxonomy != TAXONOMY_VERSION
+        if not added and not removed and not skills_changed:
+            return self
+
+        changed_rows = self.changed_rows + len(added) + removed
+        if (self.vectorizer is None or skills_changed
+                or changed_rows > REFIT_THRESHOLD * max(self.fitted_rows, 1)):
+            return JobIndex.build(jobs, version=self.version + 1)
+
+        descriptions = [job.get("description", "") or "" for job in added]
+        matrix = sp.vstack([self.matrix[keep_rows], self.transform(descriptions)], format="csr")
+        skill_matrix = sp.vstack([self.skill_matrix[keep_rows], skill_presence_matrix(descriptions)], format="csr")
+        job_ids = np.concatenate([self.job_ids[keep_rows], [job["id"] for job in added]])
+        job_hashes = np.concatenate([self.job_hashes[keep_rows], [_text_hash(text) for text in descriptions]])
+        return JobIndex(self.vectorizer, matrix, job_ids, job_hashes, version=self.version + 1,
+                        fitted_rows=self.fitted_rows, changed_rows=changed_rows,
+                        skill_matrix=skill_matrix, skills=self.skills, taxonomy=self.taxonomy)
+
+    def rows_for(self, jobs):
+        """Index row of each job, or -1 for jobs ingested after the last index refresh."""
+        return np.array([self._row_of.get(job.get("id"), -1) for job in jobs], dtype=np.int64)
+
+    def similarities(self, resume_text, jobs, rows=None):
+        """
+        Cosine similarity between the resume and each of the given jobs.
+
+        Jobs missing from the index (ingested after the last index refresh) are
+        transformed on the fly with the stored vocabulary.
+
+        Returns:
+            numpy.ndarray: One similarity per job, in the order of `jobs`.
+        """
+        resume_vector = self.transform([resume_text])
+        rows = self.rows_for(jobs) if rows is None else rows
+        scores = np.zeros(len(jobs), dtype=np.float64)
+        indexed = rows >= 0
+        if indexed.any():
+            scores[indexed] = (self.matrix[rows[indexed]] @ resume_vector.T).toarray().ravel()
+        if not indexed.all():
+            missing = np.flatnonzero(~indexed)
+            vectors = self.transform([jobs[i].get("description", "") or "" for i in missing])
+            scores[missing] = (vectors @ resume_vector.T).toarray().ravel()
+        return scores
+
+    def skill_columns(self, resume_skills):
+        """Skill matrix columns of the resume skills; skills outside the vocabulary are left out."""
+        return [self._skill_col[skill] for skill in resume_skills if skill in self._skill_col]
+
+    def skill_hits(self, rows, resume_skills):
+        """
+        Number of resume skills present in each of the given index rows.
+
+        Returns:
+            numpy.ndarray: One count per row.
+        """
+        columns = self.skill_columns(resume_skills)
+        if not columns or len(rows) == 0:
+            return np.zeros(len(rows), dtype=np.float64)
+        return np.asarray(self.skill_matrix[rows][:, columns].sum(axis=1), dtype=np.float64).ravel()
+
+    def skill_rows(self, resume_skills):
+        """
+        Rows of the jobs mentioning at least one of the resume skills.
+
+        Reads only the resume skills' columns of a CSC copy of the skill matrix,
+        so the cost depends on how common those skills are.
+
+        Returns:
+            numpy.ndarray: Sorted row numbers.
+        """
+        columns = self.skill_columns(resume_skills)
+        if not columns or self.skill_matrix is None:
+            return np.empty(0, dtype=np.int64)
+        if self._skill_postings is None:
+            self._skill_postings = self.skill_matrix.tocsc()
+        return np.unique(self._skill_postings[:, columns].indices).astype(np.int64)
+
+    def candidate_similarities(self, resume_text):
+        """
+        Cosine similarity for the jobs sharing at least one term with the resume.
+
+        Only the postings of the resume's terms are read, so the cost depends on
+        how common those terms are rather than on the corpus size. Every job left
+        out has a similarity of zero.
+
+        Returns:
+            tuple: (rows, similarities) as NumPy arrays, one entry per candidate job.
+                Use `job_ids[rows]` for the database ids.
+        """
+        resume_vector = self.transform([resume_text])
+        if resume_vector.nnz == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        postings = self.inverted[:, resume_vector.indices]
+        # Each posting contributes job_weight * resume_weight of its term
+        contributions = postings.data * np.repeat(resume_vector.data, np.diff(postings.indptr))
+        rows, inverse = np.unique(postings.indices, return_inverse=True)
+        similarities = np.bincount(inverse, weights=contributions, minlength=len(rows))
+        return rows, similarities
+
+    def save(self, index_dir=INDEX_DIR):
+        """Write this index as a new version directory and switch CURRENT to it."""
+        os.makedirs(index_dir, exist_ok=True)
+        name = f"v{self.version}"
+        tmp_path = os.path.join(index_dir, f".{name}.tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        with open(os.path.join(tmp_path, "vectorizer.pkl"), "wb") as f:
+            pickle.dump(self.vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)
+        matrix = self.matrix.tocsr()
+        np.save(os.path.join(tmp_path, "data.npy"), matrix.data)
+        np.save(os.path.join(tmp_path, "indices.npy"), matrix.indices)
+        np.save(os.path.join(tmp_path, "indptr.npy"), matrix.indptr)
+        inverted = self.inverted
+        np.save(os.path.join(tmp_path, "inverted_data.npy"), inverted.data)
+        np.save(os.path.join(tmp_path, "inverted_indices.npy"), inverted.indices)
+        np.save(os.path.join(tmp_path, "inverted_indptr.npy"), inverted.indptr)
+        skill_matrix = self.skill_matrix.tocsr()
+        np.save(os.path.join(tmp_path, "skills_data.npy"), skill_matrix.data)
+        np.save(os.path.join(tmp_path, "skills_indices.npy"), skill_matrix.indices)
+        np.save(os.path.join(tmp_path, "skills_indptr.npy"), skill_matrix.indptr)
+        np.save(os.path.join(tmp_path, "job_ids.npy"), self.job_ids)
+        np.save(os.path.join(tmp_path, "job_hashes.npy"), self.job_hashes)
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump({"format": FORMAT_VERSION, "version": self.version, "shape": list(matrix.shape),
+                       "fitted_rows": self.fitted_rows, "changed_rows": self.changed_rows,
+                       "skills": self.skills, "taxonomy": self.taxonomy}, f)
+
+        final_path = os.path.join(index_dir, name)
+        shutil.rmtree(final_path, ignore_errors=True)
+        os.replace(tmp_path, final_path)
+        current_tmp = os.path.join(index_dir, "CURRENT.tmp")
+        with open(current_tmp, "w") as f:
+            f.write(name)
+        os.replace(current_tmp, os.path.join(index_dir, "CURRENT"))
+        _remove_old_versions(index_dir, keep=name)
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR, mmap=True):
+        """
+        Load the CURRENT index version, memory-mapping the vector arrays by default.
+
+        Returns:
+            JobIndex or None: None when no index has been saved yet, or it has an outdated format.
+        """
+        name = read_current_version(index_dir)
+        if name is None:
+            return None
+        path = os.path.join(index_dir, name)
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            return None
+        with open(os.path.join(path, "vectorizer.pkl"), "rb") as f:
+            vectorizer = pickle.load(f)
+        data = np.load(os.path.join(path, "data.npy"), mmap_mode=mmap_mode)
+        indices = np.load(os.path.join(path, "indices.npy"), mmap_mode=mmap_mode)
+        indptr = np.load(os.path.join(path, "indptr.npy"), mmap_mode=mmap_mode)
+        matrix = sp.csr_matrix((data, indices, indptr), shape=tuple(meta["shape"]), copy=False)
+        inverted = sp.csc_matrix((np.load(os.path.join(path, "inverted_data.npy"), mmap_mode=mmap_mode),
+                                  np.load(os.path.join(path, "inverted_indices.npy"), mmap_mode=mmap_mode),
+                                  np.load(os.path.join(path, "inverted_indptr.npy"), mmap_mode=mmap_mode)),
+                                 shape=tuple(meta["shape"]), copy=False)
+        skill_matrix = sp.csr_matrix((np.load(os.path.join(path, "skills_data.npy"), mmap_mode=mmap_mode),
+                                      np.load(os.path.join(path, "skills_indices.npy"), mmap_mode=mmap_mode),
+                                      np.load(os.path.join(path, "skills_indptr.npy"), mmap_mode=mmap_mode)),
+                                     shape=(meta["shape"][0], len(meta["skills"])), copy=False)
+        return cls(vectorizer, matrix,
+                   np.load(os.path.join(path, "job_ids.npy")),
+                   np.load(os.path.join(path, "job_hashes.npy")),
+                   version=meta["version"], fitted_rows=meta["fitted_rows"], changed_rows=meta["changed_rows"],
+                   inverted=inverted, skill_matrix=skill_matrix, skills=meta["skills"], taxonomy=meta["taxonomy"])
+
+def read_current_version(index_dir=INDEX_DIR):
+    try:
+        with open(os.path.join(index_dir, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def _remove_old_versions(index_dir, keep):
+    # Keep the previous version around so a reader that just opened it can finish
+    versions = sorted((entry for entry in os.listdir(index_dir) if entry.startswith("v") and entry != keep),
+                      key=lambda entry: int(entry[1:]) if entry[1:].isdigit() else -1)
+    for entry in versions[:-1]:
+        shutil.rmtree(os.path.join(index_dir, entry), ignore_errors=True)
+
+def refresh_index(jobs, index_dir=INDEX_DIR, rebuild=False):
+    """
+    Update the on-disk index to match `jobs`, saving only if something changed.
+
+    Args:
+        jobs (list): The full current corpus from database.load_jobs().
+        index_dir (str): Directory holding the index versions.
+        rebuild (bool): Refit from scratch instead of updating incrementally.
+
+    Returns:
+        JobIndex: The up-to-date index.
+    """
+    index = None if rebuild else JobIndex.load(index_dir, mmap=False)
+    if index is None:
+        previous = read_current_version(index_dir)
+        version = int(previous[1:]) + 1 if previous and previous[1:].isdigit() else 1
+        updated = JobIndex.build(jobs, version=version)
+    else:
+        updated = index.update(jobs)
+    if updated is not index:
+        updated.save(index_dir)
+    return updated
+
+_loaded = None
+_loaded_lock = threading.Lock()
+
+def current_index(index_dir=INDEX_DIR):
+    """
+    Return the latest saved index, reloading it when the ingestion worker published a new version.
+
+    Returns:
+        JobIndex or None: None when no index has been built yet.
+    """
+    global _loaded
+    name = read_current_version(index_dir)
+    if name is None:
+        return None
+    with _loaded_lock:
+        if _loaded is None or f"v{_loaded.version}" != name:
+            _loaded = JobIndex.load(index_dir)
+        return _loaded
@@ -1,162 +1,301 @@
-import requests
-from bs4 import BeautifulSoup
-import time
+from bs4 import BeautifulSoup, SoupStrainer
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from urllib.parse import urljoin
 
-def scrape_indeed_jobs(query, location="", url_override=None):
+import metrics
+from http_fetch import Fetcher, HostRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a whole platform scrape
+PLATFORM_TIMEOUT = 15
+# Result cards kept per search page
+CARDS_PER_PAGE = 5
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# lxml is much faster than the pure-Python parser; fall back when it isn't installed
+try:
+    import lxml
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Shared fetch layer: pooled sessions, retries, per-host rate limiting and response cache
+fetcher = Fetcher(rate_limiter=HostRateLimiter())
+
+# Where each platform's search results live and how to read a job card.
+#   search_url  format string with {query} and {location}, spaces encoded as `space`
+#   card        (tag, class) of one result card
+#   fields      (tag, class) inside the card for each job field, all required;
+#               None instead of a selector means the value is in `constants`
+#   link        "title" to take the href of the title element, else (tag, class or None)
+#               for the first matching element with an href
+#   url_prefix  prepended to relative job links
+#   next_page   (tag, attrs) of the link to the next result page, for crawling
+#   detail      {field: (tag, attrs)} read from a job's own page when crawling
+PLATFORMS = {
+    "Indeed": {
+        "search_url": "https://www.indeed.com/jobs?q={query}&l={location}",
+        "space": "+",
+        "card": ("div", "job_seen_beacon"),
+        "fields": {
+            "title": ("h2", "jobTitle"),
+            "company": ("span", "companyName"),
+            "location": ("div", "companyLocation"),
+            "description": ("div", "job-snippet"),
+        },
+        "link": ("a", None),
+        "url_prefix": "https://www.indeed.com",
+        "next_page": ("a", {"data-testid": "pagination-page-next"}),
+        "detail": {"description": ("div", {"id": "jobDescriptionText"})},
+    },
+    "Glassdoor": {
+        "search_url": "https://www.glassdoor.com/Job/jobs.htm?sc.keyword={query}&locT=C&locId=0&locKeyword={location}",
+        "space": "+",
+        "card": ("li", "jl"),
+        "fields": {
+            "title": ("a", "jobLink"),
+            "company": ("div", "jobHeader"),
+            "location": ("span", "subtle loc"),
+            "description": ("div", "jobDescriptionContent"),
+        },
+        "link": "title",
+        "url_prefix": "https://www.glassdoor.com",
+        "next_page": ("a", {"data-test": "pagination-next"}),
+        "detail": {"description": ("div", {"class": "jobDescriptionContent"})},
+    },
+    "LinkedIn": {
+        "search_url": "https://www.linkedin.com/jobs/search?keywords={query}&location={location}",
+        "space": "%20",
+        "card": ("li", "result-card"),
+        "fields": {
+            "title": ("h3", "result-card__title"),
+            "company": ("h4", "result-card__subtitle"),
+            "location": ("span", "job-result-card__location"),
+            "description": None,
+        },
+        # LinkedIn job description requires additional requests or API
+        "constants": {"description": ""},
+        "link": ("a", None),
+        "url_prefix": "",
+        "next_page": ("a", {"aria-label": "Next"}),
+        "detail": {"description": ("div", {"class": "show-more-less-html__markup"})},
+    },
+    "Freelancer": {
+        "search_url": "https://www.freelancer.com/jobs/{query}/",
+        "space": "-",
+        "card": ("div", "JobSearchCard-item"),
+        "fields": {
+            "title": ("a", "JobSearchCard-primary-heading-link"),
+            "company": None,
+            "location": None,
+            "description": ("p", "JobSearchCard-primary-description"),
+        },
+        "constants": {"company": "Freelancer", "location": ""},
+        "link": "title",
+        "url_prefix": "https://www.freelancer.com",
+        "next_page": ("a", {"rel": "next"}),
+        "detail": {"description": ("div", {"class": "PageProjectViewLogout-detail"})},
+    },
+    "Upwork": {
+        "search_url": "https://www.upwork.com/search/jobs/?q={query}",
+        "space": "%20",
+        "card": ("section", "air-card-hover"),
+        "fields": {
+            "title": ("h4", "job-title"),
+            "company": None,
+            "location": None,
+            "description": ("span", "break-word"),
+        },
+        "constants": {"company": "Upwork", "location": ""},
+        "link": ("a", None),
+        "url_prefix": "",
+        "next_page": ("a", {"rel": "next"}),
+        "detail": {"description": ("div", {"data-test": "Description"})},
+    },
+}
+
+# Attributes holding space-separated words, like class="a b" or rel="nofollow next"
+WORD_ATTRIBUTES = ("class", "rel")
+
+def _words_match(expected):
+    words = set(expected.split())
+    return lambda value: value is not None and words <= set(value.split())
+
+def _strainer(tag, attrs):
+    """
+    SoupStrainer for elements with the given attributes.
+
+    The strainer sees the raw attribute string, so values of WORD_ATTRIBUTES are
+    matched as words of it, as find_all does: {"class": "jl"} matches class="jl react-job-listing".
+    """
+    return SoupStrainer(tag, attrs={name: _words_match(value) if name in WORD_ATTRIBUTES else value
+                                    for name, value in attrs.items()})
+
+def search_url(platform, query, location=""):
+    spec = PLATFORMS[platform]
+    space = spec["space"]
+    return spec["search_url"].format(query=query.replace(" ", space), location=location.replace(" ", space))
+
+def parse_cards(html, platform, limit=CARDS_PER_PAGE):
+    """
+    Parse the job cards of a search result page.
+
+    Only the card elements are built into a tree (SoupStrainer), using lxml when
+    available. Of the first `limit` cards, those missing a required field are skipped.
+
+    Args:
+        html (str or bytes): Search result page.
+        platform (str): Key of PLATFORMS.
+        limit (int): Cards to read from the page; None reads all of them.
+
+    Returns:
+        list: Job dictionaries.
+    """
+    spec = PLATFORMS[platform]
+    card_tag, card_class = spec["card"]
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_strainer(card_tag, {"class": card_class}))
     jobs = []
-    headers = {"User-Agent": "Mozilla/5.0"}
-    if url_override:
-        url = url_override
-    else:
-        url = f"https://www.indeed.com/jobs?q={query.replace(' ', '+')}&l={location.replace(' ', '+')}"
-    r = requests.get(url, headers=headers)
-    soup = BeautifulSoup(r.text, "html.parser")
-    cards = soup.find_all("div", class_="job_seen_beacon")
-    for card in cards[:5]:
-        title = card.find("h2", class_="jobTitle")
-        company = card.find("span", class_="companyName")
-        location_elem = card.find("div", class_="companyLocation")
-        desc = card.find("div", class_="job-snippet")
-        link = card.find("a", href=True)
-        if title and company and location_elem and desc and link:
-            job = {
-                "platform": "Indeed",
-                "title": title.text.strip(),
-                "company": company.text.strip(),
-                "location": location_elem.text.strip(),
-                "description": desc.text.strip(),
-                "url": "https://www.indeed.com" + link['href']
-            }
+    for card in soup.find_all(card_tag, class_=card_class, limit=limit):
+        job = _parse_card(card, platform, spec)
+        if job is not None:
             jobs.append(job)
     return jobs
 
-def scrape_glassdoor_jobs(query, location="", url_override=None):
-    jobs = []
-    headers = {"User-Agent": "Mozilla/5.0"}
-    if url_override:
-        url = url_override
+def parse_next_page(html, platform, page_url):
+    """Return the absolute URL of the next result page, or None on the last page."""
+    tag, attrs = PLATFORMS[platform]["next_page"]
+    strainer = _strainer(tag, attrs)
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=strainer)
+    link = next((element for element in soup.find_all(strainer) if element.get("href")), None)
+    return urljoin(page_url, link["href"]) if link else None
+
+def parse_detail(html, platform):
+    """
+    Read the fields listed under the platform's "detail" spec from a job's own page.
+
+    Returns:
+        dict: The fields found, with non-empty text.
+    """
+    fields = {}
+    for field, (tag, attrs) in PLATFORMS[platform]["detail"].items():
+        strainer = _strainer(tag, attrs)
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=strainer)
+        element = soup.find(strainer)
+        text = element.get_text(" ", strip=True) if element else ""
+        if text:
+            fields[field] = text
+    return fields
+
+def _parse_card(card, platform, spec):
+    job = {"platform": platform}
+    elements = {}
+    for field, selector in spec["fields"].items():
+        if selector is None:
+            job[field] = spec["constants"][field]
+            continue
+        tag, css_class = selector
+        element = card.find(tag, class_=css_class)
+        if not element:
+            return None
+        elements[field] = element
+        job[field] = element.text.strip()
+
+    if spec["link"] == "title":
+        href = elements["title"].get("href")
     else:
-        url = f"https://www.glassdoor.com/Job/jobs.htm?sc.keyword={query.replace(' ', '+')}&locT=C&locId=0&locKeyword={location.replace(' ', '+')}"
-    r = requests.get(url, headers=headers)
-    soup = BeautifulSoup(r.text, "html.parser")
-    cards = soup.find_all("li", class_="jl")
-    for card in cards[:5]:
-        title = card.find("a", class_="jobLink")
-        company = card.find("div", class_="jobHeader")
-        location_elem = card.find("span", class_="subtle loc")
-        desc = card.find("div", class_="jobDescriptionContent")
-        link = title['href'] if title else None
-        if title and company and location_elem and desc and link:
-            job = {
-                "platform": "Glassdoor",
-                "title": title.text.strip(),
-                "company": company.text.strip(),
-                "location": location_elem.text.strip(),
-                "description": desc.text.strip(),
-                "url": "https://www.glassdoor.com" + link
-            }
-            jobs.append(job)
-    return jobs
+        tag, css_class = spec["link"]
+        link = card.find(tag, class_=css_class, href=True) if css_class else card.find(tag, href=True)
+        href = link["href"] if link else None
+    if not href:
+        return None
+    job["url"] = spec["url_prefix"] + href
+    return job
+
+def scrape_platform(platform, query, location="", url_override=None):
+    """
+    Fetch one search result page of a platform and parse its job cards.
+
+    Args:
+        platform (str): Key of PLATFORMS.
+        query (str): Job title or keywords.
+        location (str): Location filter, for platforms whose search supports it.
+        url_override (str): Fetch this URL instead of the platform's search URL.
+
+    Returns:
+        list: Job dictionaries.
+
+    Raises:
+        requests.RequestException: The page could not be fetched or answered with an error status.
+    """
+    url = url_override or search_url(platform, query, location)
+    with metrics.timed(f"scrape_{platform.lower()}"):
+        r = fetcher.fetch(url, headers=HEADERS)
+        # A blocked or failing board must not pass for one without results
+        r.raise_for_status()
+        return parse_cards(r.content, platform)
+
+def scrape_indeed_jobs(query, location="", url_override=None):
+    return scrape_platform("Indeed", query, location, url_override)
+
+def scrape_glassdoor_jobs(query, location="", url_override=None):
+    return scrape_platform("Glassdoor", query, location, url_override)
 
 def scrape_linkedin_jobs(query, location="", url_override=None):
-    jobs = []
-    headers = {"User-Agent": "Mozilla/5.0"}
-    if url_override:
-        url = url_override
-    else:
-        url = f"https://www.linkedin.com/jobs/search?keywords={query.replace(' ', '%20')}&location={location.replace(' ', '%20')}"
-    r = requests.get(url, headers=headers)
-    soup = BeautifulSoup(r.text, "html.parser")
-    cards = soup.find_all("li", class_="result-card")
-    for card in cards[:5]:
-        title = card.find("h3", class_="result-card__title")
-        company = card.find("h4", class_="result-card__subtitle")
-        location_elem = card.find("span", class_="job-result-card__location")
-        link = card.find("a", href=True)
-        if title and company and location_elem and link:
-            job = {
-                "platform": "LinkedIn",
-                "title": title.text.strip(),
-                "company": company.text.strip(),
-                "location": location_elem.text.strip(),
-                "description": "",  # LinkedIn job description requires additional requests or API
-                "url": link['href']
-            }
-            jobs.append(job)
-    return jobs
+    return scrape_platform("LinkedIn", query, location, url_override)
 
-def scrape_freelancer_jobs(query):
-    jobs = []
-    headers = {"User-Agent": "Mozilla/5.0"}
-    url = f"https://www.freelancer.com/jobs/{query.replace(' ', '-')}/"
-    r = requests.get(url, headers=headers)
-    soup = BeautifulSoup(r.text, "html.parser")
-    cards = soup.find_all("div", class_="JobSearchCard-item")
-    for card in cards[:5]:
-        title = card.find("a", class_="JobSearchCard-primary-heading-link")
-        company = "Freelancer"
-        location_elem = ""
-        desc = card.find("p", class_="JobSearchCard-primary-description")
-        link = title['href'] if title else None
-        if title and desc and link:
-            job = {
-                "platform": "Freelancer",
-                "title": title.text.strip(),
-                "company": company,
-                "location": location_elem,
-                "description": desc.text.strip(),
-                "url": "https://www.freelancer.com" + link
-            }
-            jobs.append(job)
-    return jobs
+def scrape_freelancer_jobs(query, url_override=None):
+    return scrape_platform("Freelancer", query, url_override=url_override)
 
-def scrape_upwork_jobs(query):
-    jobs = []
-    headers = {"User-Agent": "Mozilla/5.0"}
-    url = f"https://www.upwork.com/search/jobs/?q={query.replace(' ', '%20')}"
-    r = requests.get(url, headers=headers)
-    soup = BeautifulSoup(r.text, "html.parser")
-    cards = soup.find_all("section", class_="air-card-hover")
-    for card in cards[:5]:
-        title = card.find("h4", class_="job-title")
-        company = "Upwork"
-        location_elem = ""
-        desc = card.find("span", class_="break-word")
-        link = card.find("a", href=True)
-        if title and desc and link:
-            job = {
-                "platform": "Upwork",
-                "title": title.text.strip(),
-                "company": company,
-                "location": location_elem,
-                "description": desc.text.strip(),
-                "url": link['href']
-            }
-            jobs.append(job)
-    return jobs
+def scrape_upwork_jobs(query, url_override=None):
+    return scrape_platform("Upwork", query, url_override=url_override)
 
-def scrape_jobs(query, location="", skills=None):
+def scrape_jobs(query, location="", skills=None, timeout=PLATFORM_TIMEOUT):
     """
-    Scrape jobs from multiple platforms and filter by skills if provided.
+    Scrape jobs from multiple platforms concurrently and filter by skills if provided.
+
+    Platforms are fetched in parallel threads. A platform that raises or does not
+    finish within `timeout` seconds is skipped, so a slow or unreachable site only
+    costs its own results instead of failing the whole scrape.
 
     Args:
         query (str): Job title or keywords.
         location (str): Location filter.
         skills (list or set): Skills keywords to filter jobs.
+        timeout (float): Seconds to wait for each platform before giving up on it.
 
     Returns:
-        list: Filtered list of job dictionaries.
+        list: Filtered list of job dictionaries, grouped by platform in a fixed order.
     """
+    platforms = [
+        ("Indeed", scrape_indeed_jobs, (query, location)),
+        ("Glassdoor", scrape_glassdoor_jobs, (query, location)),
+        ("LinkedIn", scrape_linkedin_jobs, (query, location)),
+        ("Freelancer", scrape_freelancer_jobs, (query,)),
+        ("Upwork", scrape_upwork_jobs, (query,)),
+    ]
+
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=len(platforms), thread_name_prefix="scraper")
+    futures = {executor.submit(func, *args): name for name, func, args in platforms}
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.warning("Scraping %s failed: %s", name, e)
+    except TimeoutError:
+        pending = [name for future, name in futures.items() if not future.done()]
+        logger.warning("Scraping timed out after %ss for: %s", timeout, ", ".join(pending))
+    finally:
+        # Don't block on stragglers; their requests end at the fetcher's timeout anyway
+        executor.shutdown(wait=False, cancel_futures=True)
+
     jobs = []
-    jobs.extend(scrape_indeed_jobs(query, location))
-    time.sleep(1)
-    jobs.extend(scrape_glassdoor_jobs(query, location))
-    time.sleep(1)
-    jobs.extend(scrape_linkedin_jobs(query, location))
-    time.sleep(1)
-    jobs.extend(scrape_freelancer_jobs(query))
-    time.sleep(1)
-    jobs.extend(scrape_upwork_jobs(query))
+    for name, _, _ in platforms:
+        jobs.extend(results.get(name, []))
 
     if skills:
         skills_lower = set(skill.lower() for skill in skills)
@@ -1,82 +1,202 @@
 # matcher.py - Match jobs to resume using TF-IDF vectorization and cosine similarity
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
-def match_jobs(resume_data, jobs):
+from skills import skill_presence_matrix
+
+def match_jobs(resume_data, jobs, index=None):
     """
     Calculate match scores between resume and job descriptions with enhanced weighting and eligibility.
 
     Args:
         resume_data (dict): Parsed resume data including skills, education_level_score, experience_years, full_text.
         jobs (list): List of job dictionaries with descriptions.
+        index (JobIndex): Optional precomputed job index. When given, only the resume is
+            vectorized and job vectors and skill presence come from the index instead
+            of being recomputed.
 
     Returns:
         list: Jobs sorted by combined match score in descending order, each with 'match_score' and 'eligibility' keys.
     """
     resume_text = resume_data.get("full_text", "")
     resume_skills = set(resume_data.get("skills", []))
-    resume_education_score = resume_data.get("education_level_score", 0)
-    resume_experience_years = resume_data.get("experience_years", 0)
 
     job_descriptions = [job.get("description", "") for job in jobs]
 
-    # Vectorize resume and job descriptions using TF-IDF
-    vectorizer = TfidfVectorizer(stop_words='english')
-    try:
-        vectors = vectorizer.fit_transform([resume_text] + job_descriptions)
-    except ValueError:
-        # Handle empty vocabulary error
-        for job in jobs:
-            job["match_score"] = 0.0
-            job["eligibility"] = "Insufficient data"
-        return jobs
+    if index is not None:
+        # Job vectors and skill presence are precomputed; only the resume is transformed
+        rows = index.rows_for(jobs)
+        similarities = index.similarities(resume_text, jobs, rows=rows)
+        skill_hits = np.zeros(len(jobs), dtype=np.float64)
+        indexed = rows >= 0
+        skill_hits[indexed] = index.skill_hits(rows[indexed], resume_skills)
+        missing = np.flatnonzero(~indexed)
+        if len(missing):
+            skill_hits[missing] = _skill_hits([job_descriptions[i] for i in missing], resume_skills)
+    else:
+        # Vectorize resume and job descriptions using TF-IDF
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+        vectorizer = TfidfVectorizer(stop_words='english')
+        try:
+            vectors = vectorizer.fit_transform([resume_text] + job_descriptions)
+        except ValueError:
+            # Handle empty vocabulary error
+            for job in jobs:
+                job["match_score"] = 0.0
+                job["eligibility"] = "Insufficient data"
+            return jobs
+
+        resume_vector = vectors[0]
+        job_vectors = vectors[1:]
+
+        # Compute cosine similarity between resume and each job description
+        similarities = cosine_similarity(resume_vector, job_vectors).flatten()
+        skill_hits = _skill_hits(job_descriptions, resume_skills)
+
+    scores = combined_scores(similarities, skill_hits, resume_data)
+    eligibilities = eligibility_labels(scores)
+    match_scores = np.round(scores, 2)
+    for i, job in enumerate(jobs):
+        job["match_score"] = float(match_scores[i])
+        job["eligibility"] = str(eligibilities[i])
 
-    resume_vector = vectors[0]
-    job_vectors = vectors[1:]
+    # Sort jobs by combined match score descending
+    order = np.argsort(-match_scores, kind="stable")
+    return [jobs[i] for i in order]
 
-    # Compute cosine similarity between resume and each job description
-    similarities = cosine_similarity(resume_vector, job_vectors).flatten()
+def match_top_k(resume_data, jobs, index, k=10):
+    """
+    Return only the k best matching jobs, using the index's inverted term index.
+
+    Only jobs sharing at least one term or skill with the resume are scored (a skill
+    can match through an alias or a token TF-IDF drops, like the "c" of "c++"),
+    along with the jobs ingested after the last index refresh, which are
+    transformed on the fly as in match_jobs. Every other job scores the resume
+    bonuses alone, no more than any scored job: when fewer than k jobs were scored,
+    the rest of the corpus fills the k results with those scores, so a resume
+    sharing nothing with any job gets the same bonus-only scores as from match_jobs.
+    The best k are picked with a partial selection instead of sorting all scores,
+    and only those k get result dictionaries. Scores are rounded before ranking, as
+    in match_jobs, so the result is the first k jobs match_jobs would return.
 
-    enhanced_jobs = []
-    for i, job in enumerate(jobs):
-        # Basic text similarity score
-        text_score = float(similarities[i]) * 100
-
-        # Skill matching score (percentage of job skills found in resume)
-        job_skills = set()
-        # Extract skills from job description by simple keyword matching (can be improved)
-        for skill in resume_skills:
-            if skill in job.get("description", "").lower():
-                job_skills.add(skill)
-        skill_match_score = (len(job_skills) / len(resume_skills)) * 100 if resume_skills else 0
-
-        # Education level match (simple heuristic: if resume education level >= 2 (Bachelor), add bonus)
-        education_bonus = 10 if resume_education_score >= 2 else 0
-
-        # Experience years match (if resume experience years >= 2, add bonus)
-        experience_bonus = 10 if resume_experience_years >= 2 else 0
-
-        # Combine scores with weights
-        combined_score = (0.5 * text_score) + (0.3 * skill_match_score) + education_bonus + experience_bonus
-        combined_score = min(combined_score, 100.0)  # Cap at 100%
-
-        # Eligibility message based on combined score
-        if combined_score >= 75:
-            eligibility = "Highly Eligible"
-        elif combined_score >= 50:
-            eligibility = "Moderately Eligible"
-        elif combined_score > 0:
-            eligibility = "Low Eligibility"
-        else:
-            eligibility = "Insufficient data"
-
-        job["match_score"] = round(combined_score, 2)
-        job["eligibility"] = eligibility
-        enhanced_jobs.append(job)
+    Args:
+        resume_data (dict): Parsed resume data, as for match_jobs.
+        jobs (list): Current job corpus, job dictionaries with 'id'. Indexed jobs
+            missing from this list (e.g. expired) are ignored.
+        index (JobIndex): Job index built over the corpus.
+        k (int): Number of jobs to return.
 
-    # Sort jobs by combined match score descending
-    jobs_sorted = sorted(enhanced_jobs, key=lambda x: x["match_score"], reverse=True)
+    Returns:
+        list: Copies of at most k jobs sorted by match score descending, each with 'match_score' and 'eligibility' keys.
+    """
+    resume_text = resume_data.get("full_text", "")
+    resume_skills = set(resume_data.get("skills", []))
+    job_rows = index.rows_for(jobs)
+    position_of_row = {int(row): position for position, row in enumerate(job_rows.tolist()) if row >= 0}
+
+    rows, similarities = index.candidate_similarities(resume_text)
+    # Jobs sharing a skill but no term with the resume still earn their skill score
+    skill_only = np.setdiff1d(index.skill_rows(resume_skills), rows, assume_unique=True)
+    rows = np.concatenate([rows, skill_only])
+    similarities = np.concatenate([similarities, np.zeros(len(skill_only))])
+    positions = np.fromiter((position_of_row.get(row, -1) for row in rows.tolist()), dtype=np.int64, count=len(rows))
+    live = positions >= 0
+    rows, similarities, positions = rows[live], similarities[live], positions[live]
+    skill_hits = index.skill_hits(rows, resume_skills)
+
+    # Jobs upserted after the last index refresh are not in the inverted index
+    missing = np.flatnonzero(job_rows < 0)
+    if len(missing):
+        missing_jobs = [jobs[i] for i in missing]
+        missing_similarities = index.similarities(resume_text, missing_jobs, rows=job_rows[missing])
+        similarities = np.concatenate([similarities, missing_similarities])
+        missing_hits = _skill_hits([job.get("description", "") or "" for job in missing_jobs], resume_skills)
+        skill_hits = np.concatenate([skill_hits, missing_hits])
+        positions = np.concatenate([positions, missing])
+
+    if len(positions) < k:
+        # Too few jobs share a term or skill with the resume: the others score on their bonuses alone
+        rest = np.setdiff1d(np.flatnonzero(job_rows >= 0), positions)
+        similarities = np.concatenate([similarities, np.zeros(len(rest))])
+        skill_hits = np.concatenate([skill_hits, np.zeros(len(rest))])
+        positions = np.concatenate([positions, rest])
+
+    # Corpus order, so equal scores rank as they do in match_jobs
+    order = np.argsort(positions, kind="stable")
+    similarities, skill_hits, positions = similarities[order], skill_hits[order], positions[order]
+    scores = np.round(combined_scores(similarities, skill_hits, resume_data), 2)
+
+    top = top_k_indices(scores, k)
+    eligibilities = eligibility_labels(scores[top])
+    results = []
+    for i, eligibility in zip(top, eligibilities):
+        job = dict(jobs[int(positions[i])])
+        job["match_score"] = float(scores[i])
+        job["eligibility"] = str(eligibility)
+        results.append(job)
+    return results
+
+def combined_scores(similarities, skill_hits, resume_data):
+    """
+    Combine text similarity, skill match and resume bonuses for many jobs at once.
+
+    Args:
+        similarities (numpy.ndarray): Cosine similarity per job.
+        skill_hits (numpy.ndarray): Number of resume skills found in each job.
+        resume_data (dict): Parsed resume data (skills, education_level_score, experience_years).
+
+    Returns:
+        numpy.ndarray: Combined score per job, capped at 100.
+    """
+    resume_skills = resume_data.get("skills", [])
+
+    # Basic text similarity score
+    text_scores = np.asarray(similarities, dtype=np.float64) * 100
+
+    # Skill matching score (percentage of resume skills found in the job)
+    if resume_skills:
+        skill_match_scores = np.asarray(skill_hits, dtype=np.float64) / len(set(resume_skills)) * 100
+    else:
+        skill_match_scores = 0.0
+
+    # Education level match (simple heuristic: if resume education level >= 2 (Bachelor), add bonus)
+    education_bonus = 10 if resume_data.get("education_level_score", 0) >= 2 else 0
 
-    return jobs_sorted
+    # Experience years match (if resume experience years >= 2, add bonus)
+    experience_bonus = 10 if resume_data.get("experience_years", 0) >= 2 else 0
+
+    # Combine scores with weights
+    scores = (0.5 * text_scores) + (0.3 * skill_match_scores) + education_bonus + experience_bonus
+    return np.minimum(scores, 100.0)  # Cap at 100%
+
+def eligibility_labels(scores):
+    """Eligibility message for each combined score."""
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.select(
+        [scores >= 75, scores >= 50, scores > 0],
+        ["Highly Eligible", "Moderately Eligible", "Low Eligibility"],
+        default="Insufficient data")
+
+def top_k_indices(scores, k):
+    """
+    Indices of the k largest scores, best first, using a partition rather than a full sort.
+
+    Equal scores keep their order in `scores`, as with a stable sort of all of them.
+    """
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        # Every score tied with the k-th is kept, so ties are broken by position and not by the partition
+        kth = -np.partition(-scores, k - 1)[k - 1]
+        top = np.flatnonzero(scores >= kth)
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")][:k]
+
+def _skill_hits(descriptions, resume_skills):
+    # Jobs that are not in the index: build their skill presence on the fly
+    if not resume_skills:
+        return np.zeros(len(descriptions), dtype=np.float64)
+    presence = skill_presence_matrix(descriptions, sorted(resume_skills))
+    return np.asarray(presence.sum(axis=1), dtype=np.float64).ravel()
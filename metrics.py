@@ -0,0 +1,120 @@
+# metrics.py - Per-stage latency metrics and an optional profiling hook
+#
+# Code paths wrap their stages in `with metrics.timed("stage"):`. Each stage keeps
+# a running count and sum plus a window of recent durations, from which the
+# p50/p95/p99 quantiles are computed on demand. render_prometheus() exposes them
+# in the Prometheus text format for the app's /metrics endpoint.
+
+import cProfile
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Recent durations kept per stage for the quantiles
+WINDOW = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+# Directory for per-request cProfile dumps; profiling is off when unset
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+
+# cProfile allows a single active profiler at a time on recent Pythons
+_profile_lock = threading.Lock()
+
+class StageStats:
+    """Count, total and recent durations of one stage."""
+
+    def __init__(self, window=WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.recent.append(seconds)
+
+    def summary(self):
+        """Return count, sum and the QUANTILES (nearest rank over the recent window)."""
+        with self._lock:
+            count, total, recent = self.count, self.total, sorted(self.recent)
+        quantiles = {}
+        for q in QUANTILES:
+            quantiles[q] = recent[min(len(recent) - 1, int(q * len(recent)))] if recent else 0.0
+        return {"count": count, "sum": total, "quantiles": quantiles}
+
+_stages = {}
+_stages_lock = threading.Lock()
+
+def observe(stage, seconds):
+    stats = _stages.get(stage)
+    if stats is None:
+        with _stages_lock:
+            stats = _stages.setdefault(stage, StageStats())
+    stats.observe(seconds)
+
+@contextmanager
+def timed(stage):
+    """Record how long the block (or decorated function) takes under `stage`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+def snapshot():
+    """Return {stage: summary()} for every stage observed so far."""
+    with _stages_lock:
+        stages = dict(_stages)
+    return {stage: stats.summary() for stage, stats in sorted(stages.items())}
+
+def reset():
+    with _stages_lock:
+        _stages.clear()
+
+def render_prometheus(gauges=None):
+    """
+    Render the stage durations in the Prometheus text exposition format.
+
+    Args:
+        gauges (dict): Extra {name: value} gauges to include.
+
+    Returns:
+        str: The exposition text.
+    """
+    lines = ["# HELP stage_duration_seconds Time spent in each processing stage.",
+             "# TYPE stage_duration_seconds summary"]
+    for stage, summary in snapshot().items():
+        for q, value in summary["quantiles"].items():
+            lines.append(f'stage_duration_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'stage_duration_seconds_sum{{stage="{stage}"}} {summary["sum"]:.6f}')
+        lines.append(f'stage_duration_seconds_count{{stage="{stage}"}} {summary["count"]}')
+    for name, value in (gauges or {}).items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+@contextmanager
+def profiled(name, enabled=True, profile_dir=None):
+    """
+    Run the block under cProfile and dump the stats to `<profile_dir>/<name>-<timestamp>.prof`.
+
+    Does nothing unless enabled and a profile directory is given or set in PROFILE_DIR,
+    or while another block is being profiled. The dump can be read with
+    `python -m pstats`.
+    """
+    profile_dir = profile_dir or PROFILE_DIR
+    if not enabled or not profile_dir or not _profile_lock.acquire(blocking=False):
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _profile_lock.release()
+        os.makedirs(profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(profile_dir, f"{name}-{time.time():.6f}.prof"))
@@ -0,0 +1,132 @@
+# parse_pool.py - Resume parsing service backed by a process pool of warm spaCy pipelines
+#
+# Each worker process loads the trimmed pipeline once, when it starts. Single
+# resumes submitted by the web app are grouped into small batches and run through
+# nlp.pipe together; bulk jobs hand whole chunks to the workers with map().
+
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+
+# Largest batch sent to a worker, and how long to wait for a batch to fill up
+BATCH_SIZE = 16
+BATCH_WAIT = 0.02
+WORKERS = int(os.environ.get("PARSER_WORKERS", "0")) or None
+
+def _init_worker():
+    # Load the pipeline when the worker starts, so it is warm before the first task
+    from resume_parser import get_nlp
+    get_nlp()
+
+def _worker_pid(_):
+    return os.getpid()
+
+def _parse_batch(texts):
+    from resume_parser import parse_resume_texts
+    return parse_resume_texts(texts, batch_size=len(texts))
+
+class ResumeParserPool:
+    """
+    Submit/result API over a pool of parsing processes.
+
+    submit() returns a Future resolved with the parse_resume_text() dict; map()
+    parses many texts in order for bulk jobs.
+    """
+
+    def __init__(self, workers=WORKERS, batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        self._queue = queue.Queue()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="resume-parser-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, text):
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def parse(self, text, timeout=None):
+        return self.submit(text).result(timeout)
+
+    def warm_up(self):
+        """Start the worker processes and load their pipelines now instead of on the first resume."""
+        return set(self._executor.map(_worker_pid, range(self.workers)))
+
+    def map(self, texts, chunk_size=None):
+        """
+        Parse many texts, spreading nlp.pipe batches of `chunk_size` over the workers.
+
+        Yields:
+            dict: Parsed data for each text, in input order.
+        """
+        texts = list(texts)
+        chunk_size = chunk_size or self.batch_size
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        for results in self._executor.map(_parse_batch, chunks):
+            yield from results
+
+    def shutdown(self, wait=True):
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _dispatch(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # Drop requests cancelled while they were queued
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            futures = [future for _, future in batch]
+            try:
+                task = self._executor.submit(_parse_batch, [text for text, _ in batch])
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            task.add_done_callback(partial(_resolve, futures))
+
+def _resolve(futures, task):
+    error = task.exception()
+    if error is not None:
+        for future in futures:
+            future.set_exception(error)
+        return
+    for future, result in zip(futures, task.result()):
+        future.set_result(result)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide parser pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ResumeParserPool()
+            atexit.register(_pool.shutdown, wait=False)
+        return _pool
@@ -0,0 +1,121 @@
+# pdf_extract.py - PDF text extraction for uploads and bulk jobs
+#
+# Pages are streamed one at a time and joined once at the end. Extraction stops at
+# MAX_PAGES or once MAX_CHARS of text are collected, and long documents are split
+# into page ranges extracted in parallel worker processes.
+
+import atexit
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Uploads larger than this are rejected before parsing
+MAX_BYTES = 10 * 1024 * 1024
+# Pages read per document; later pages are ignored
+MAX_PAGES = 50
+# Stop reading further pages once this much text was collected
+MAX_CHARS = 200_000
+# Documents with at least this many pages are extracted in parallel
+PARALLEL_MIN_PAGES = 8
+WORKERS = int(os.environ.get("PDF_WORKERS", "0")) or os.cpu_count() or 1
+
+class PdfTooLarge(ValueError):
+    """The PDF exceeds the byte limit."""
+
+def _reader(data):
+    from PyPDF2 import PdfReader
+    return PdfReader(io.BytesIO(data))
+
+def iter_page_texts(data, start=0, stop=MAX_PAGES):
+    """
+    Yield the text of pages start..stop-1, one page at a time.
+
+    Args:
+        data (bytes): PDF file contents.
+        start (int): First page to read.
+        stop (int): Page to stop before (clamped to the page count).
+    """
+    return _page_texts(_reader(data).pages, start, stop)
+
+def _page_texts(pages, start, stop):
+    for number in range(start, min(stop, len(pages))):
+        yield pages[number].extract_text() or ""
+
+def _extract_range(data, start, stop):
+    return list(iter_page_texts(data, start, stop))
+
+def extract_text(data, max_pages=MAX_PAGES, max_bytes=MAX_BYTES, max_chars=MAX_CHARS, parallel=True):
+    """
+    Extract the text of a PDF, one line break after each page.
+
+    Args:
+        data (bytes): PDF file contents.
+        max_pages (int): Pages to read at most.
+        max_bytes (int): Reject larger files with PdfTooLarge.
+        max_chars (int): Stop after the page that brings the text to this length.
+        parallel (bool): Split long documents into page ranges extracted by worker processes.
+
+    Returns:
+        str: The extracted text.
+    """
+    if len(data) > max_bytes:
+        raise PdfTooLarge(f"PDF is {len(data)} bytes, the limit is {max_bytes}")
+
+    # Parsed once: the serial path reads its pages from this reader too
+    reader_pages = _reader(data).pages
+    page_count = min(len(reader_pages), max_pages)
+    if parallel and page_count >= PARALLEL_MIN_PAGES:
+        executor = get_executor()
+        step = -(-page_count // WORKERS)
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        futures = [executor.submit(_extract_range, data, start, stop) for start, stop in ranges]
+        pages = (text for future in futures for text in future.result())
+    else:
+        futures = []
+        pages = _page_texts(reader_pages, 0, page_count)
+
+    parts = []
+    collected = 0
+    for text in pages:
+        parts.append(text)
+        parts.append("\n")
+        collected += len(text) + 1
+        if collected >= max_chars:
+            break
+    for future in futures:
+        future.cancel()
+    return "".join(parts)
+
+def _extract_or_error(data, max_pages, max_bytes, max_chars):
+    try:
+        return extract_text(data, max_pages, max_bytes, max_chars, parallel=False)
+    except Exception as e:
+        return e
+
+def extract_texts(documents, max_pages=MAX_PAGES, max_bytes=MAX_BYTES, max_chars=MAX_CHARS):
+    """
+    Extract many PDFs in parallel, one document per worker task.
+
+    Args:
+        documents (list): PDF file contents (bytes) for each document.
+
+    Returns:
+        list: For each document, in order, its text or the exception raised while extracting it.
+    """
+    documents = list(documents)
+    count = len(documents)
+    return list(get_executor().map(_extract_or_error, documents, [max_pages] * count,
+                                   [max_bytes] * count, [max_chars] * count))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Return the process pool shared by page-parallel and bulk extraction, starting it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=WORKERS)
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+        return _executor
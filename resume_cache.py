@@ -0,0 +1,172 @@
+# resume_cache.py - Content-addressed SQLite cache for parsed resumes and match results
+#
+# Entries are keyed on the SHA-256 of the uploaded file, so re-uploading the same
+# PDF skips extraction, parsing and (while the job corpus is unchanged) matching.
+# Each table is kept under a byte budget by evicting least recently used entries.
+#
+# The ranked jobs of every upload are also stored as a result set, one row per
+# rank, so clients page through them with a cursor instead of receiving them all.
+
+import hashlib
+import json
+import threading
+import time
+
+import database
+import skills
+
+CACHE_DB_PATH = "cache.db"
+# Byte budgets for the serialized entries of each table
+MAX_RESUME_BYTES = 64 * 1024 * 1024
+MAX_MATCH_BYTES = 64 * 1024 * 1024
+# Seconds an upload's result set can be paged through
+RESULT_SET_TTL = 24 * 3600
+# Ranked jobs stored per result set
+RESULT_SET_LIMIT = 1000
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def file_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def connect():
+    conn = database.get_connection(CACHE_DB_PATH)
+    _ensure_schema(conn)
+    return conn
+
+def _ensure_schema(conn):
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        conn.execute('''CREATE TABLE IF NOT EXISTS parsed_resumes
+                        (file_hash TEXT PRIMARY KEY, resume_data TEXT, size INTEGER, last_used REAL)''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS match_results
+                        (file_hash TEXT, corpus_version TEXT, results TEXT, size INTEGER, last_used REAL,
+                         PRIMARY KEY (file_hash, corpus_version))''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS result_sets
+                        (result_id TEXT PRIMARY KEY, owner INTEGER, total INTEGER, created_at REAL)''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS result_rows
+                        (result_id TEXT, rank INTEGER, job TEXT, PRIMARY KEY (result_id, rank)) WITHOUT ROWID''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_result_sets_created_at ON result_sets(created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_parsed_resumes_last_used ON parsed_resumes(last_used)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_match_results_last_used ON match_results(last_used)")
+        conn.commit()
+        _schema_ready = True
+
+def _resume_key(digest):
+    # Parsed skills depend on the skill taxonomy, so parses made with another one are not reused
+    return f"{digest}:{skills.TAXONOMY_VERSION}"
+
+def get_resume(digest):
+    """Return the cached parse_resume_text() dict for a file hash, or None."""
+    key = _resume_key(digest)
+    with connect() as conn:
+        row = conn.execute("SELECT resume_data FROM parsed_resumes WHERE file_hash = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE parsed_resumes SET last_used = ? WHERE file_hash = ?", (time.time(), key))
+    return json.loads(row[0])
+
+def put_resume(digest, resume_data):
+    payload = json.dumps(resume_data)
+    with connect() as conn:
+        conn.execute("INSERT OR REPLACE INTO parsed_resumes (file_hash, resume_data, size, last_used) VALUES (?, ?, ?, ?)",
+                     (_resume_key(digest), payload, len(payload), time.time()))
+        _evict(conn, "parsed_resumes", MAX_RESUME_BYTES)
+
+def get_matches(digest, corpus_version):
+    """
+    Return the cached ranked jobs for a file hash and corpus version, or None.
+
+    Args:
+        digest (str): file_hash() of the uploaded resume.
+        corpus_version (str): Identifies the job corpus and index the results were computed against.
+    """
+    with connect() as conn:
+        row = conn.execute("SELECT results FROM match_results WHERE file_hash = ? AND corpus_version = ?",
+                           (digest, corpus_version)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE match_results SET last_used = ? WHERE file_hash = ? AND corpus_version = ?",
+                     (time.time(), digest, corpus_version))
+    return json.loads(row[0])
+
+def put_matches(digest, corpus_version, results):
+    """
+    Store ranked jobs for a resume. Results computed against any other corpus version are dropped.
+    """
+    payload = json.dumps(results)
+    with connect() as conn:
+        conn.execute("DELETE FROM match_results WHERE corpus_version != ?", (corpus_version,))
+        conn.execute('''INSERT OR REPLACE INTO match_results (file_hash, corpus_version, results, size, last_used)
+                        VALUES (?, ?, ?, ?, ?)''', (digest, corpus_version, payload, len(payload), time.time()))
+        _evict(conn, "match_results", MAX_MATCH_BYTES)
+
+def put_result_set(result_id, owner, jobs, limit=RESULT_SET_LIMIT):
+    """
+    Store an upload's ranked jobs for paging, and drop result sets older than RESULT_SET_TTL.
+
+    Args:
+        result_id (str): New unique id of the result set.
+        owner: Who may read it, e.g. the session's user ID.
+        jobs (list): Ranked job dictionaries, best first; only the first `limit` are stored.
+
+    Returns:
+        int: Number of jobs stored.
+    """
+    now = time.time()
+    rows = [(result_id, rank, json.dumps(job)) for rank, job in enumerate(jobs[:limit], start=1)]
+    with connect() as conn:
+        expired = "SELECT result_id FROM result_sets WHERE created_at < ?"
+        conn.execute(f"DELETE FROM result_rows WHERE result_id IN ({expired})", (now - RESULT_SET_TTL,))
+        conn.execute(f"DELETE FROM result_sets WHERE result_id IN ({expired})", (now - RESULT_SET_TTL,))
+        conn.execute("INSERT INTO result_sets (result_id, owner, total, created_at) VALUES (?, ?, ?, ?)",
+                     (result_id, owner, len(rows), now))
+        conn.executemany("INSERT INTO result_rows (result_id, rank, job) VALUES (?, ?, ?)", rows)
+    return len(rows)
+
+def get_result_page(result_id, owner, after=0, limit=20):
+    """
+    Read one page of a result set, by rank.
+
+    Args:
+        result_id (str): Id given to put_result_set().
+        owner: Must match the owner the result set was stored with.
+        after (int): Rank of the last job already returned (the cursor); 0 starts at the top.
+        limit (int): Jobs per page.
+
+    Returns:
+        dict or None: {"total", "jobs" (each with its 'rank'), "next": rank to continue after, or None},
+            or None when the result set does not exist, expired or belongs to someone else.
+    """
+    with connect() as conn:
+        row = conn.execute("SELECT owner, total FROM result_sets WHERE result_id = ?", (result_id,)).fetchone()
+        if row is None or row[0] != owner:
+            return None
+        rows = conn.execute('''SELECT rank, job FROM result_rows WHERE result_id = ? AND rank > ?
+                               ORDER BY rank LIMIT ?''', (result_id, after, limit)).fetchall()
+    jobs = [dict(json.loads(job), rank=rank) for rank, job in rows]
+    last = rows[-1][0] if rows else after
+    return {"total": row[1], "jobs": jobs, "next": last if last < row[1] else None}
+
+def _evict(conn, table, max_bytes):
+    # Drop least recently used entries until the table fits its byte budget
+    total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return
+    doomed = []
+    for rowid, size in conn.execute(f"SELECT rowid, size FROM {table} ORDER BY last_used"):
+        doomed.append((rowid,))
+        total -= size
+        if total <= max_bytes:
+            break
+    conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", doomed)
+
+def clear():
+    with connect() as conn:
+        conn.execute("DELETE FROM parsed_resumes")
+        conn.execute("DELETE FROM match_results")
+        conn.execute("DELETE FROM result_rows")
+        conn.execute("DELETE FROM result_sets")
@@ -1,10 +1,47 @@
 # resume_parser.py - Enhanced resume parsing to extract detailed features for better matching
 
-import spacy
 import re
+import threading
+from bisect import bisect_right
+from skills import SKILLS, find_skills
 
-# Load English tokenizer, POS tagger, parser, NER and word vectors
-nlp = spacy.load("en_core_web_sm")
+MODEL = "en_core_web_sm"
+# Only sentence boundaries are used, so the statistical components are left out
+EXCLUDED_PIPES = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+
+EDUCATION_LEVELS = {"phd": 4, "ph.d": 4, "doctorate": 4, "master": 3, "bachelor": 2, "associate": 1}
+# Degree words (plural and possessive forms too) and "university", as whole words, in one scan of the text
+EDUCATION_PATTERN = re.compile(r"(?<!\w)(?:(%s)(?:'?s)?|university)(?!\w)"
+                               % "|".join(re.escape(level) for level in EDUCATION_LEVELS), re.IGNORECASE)
+YEARS_PATTERN = re.compile(r"(\d+)\s+years?", re.IGNORECASE)
+CALENDAR_YEAR_PATTERN = re.compile(r"\b(19|20)\d{2}\b")
+
+def load_nlp(model=MODEL):
+    """
+    Load a trimmed English pipeline that only segments sentences.
+
+    The model's standalone sentence recognizer replaces the dependency parser;
+    pipelines without one get the rule-based sentencizer.
+    """
+    import spacy
+    nlp = spacy.load(model, exclude=EXCLUDED_PIPES)
+    if "senter" in nlp.disabled:
+        nlp.enable_pipe("senter")
+    elif "senter" not in nlp.pipe_names and "sentencizer" not in nlp.pipe_names:
+        nlp.add_pipe("sentencizer")
+    return nlp
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """Return the shared pipeline, loading it on first use."""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = load_nlp()
+    return _nlp
 
 def parse_resume_text(text):
     """
@@ -16,40 +53,53 @@ def parse_resume_text(text):
     Returns:
         dict: Parsed data including skills, education, experience, years of experience, education level, and full text.
     """
-    doc = nlp(text)
+    return _extract_features(get_nlp()(text), text)
 
-    # Define a list of skills to look for (expand as needed)
-    skills_list = ["python", "java", "c++", "machine learning", "data analysis", "nlp", "sql", "javascript", "flask", "django", "react"]
-    skills_found = set()
+def parse_resume_texts(texts, batch_size=16):
+    """
+    Parse many resume texts, streaming them through the pipeline with nlp.pipe.
 
-    text_lower = text.lower()
-    for skill in skills_list:
-        if skill in text_lower:
-            skills_found.add(skill)
+    Args:
+        texts (list): Full texts extracted from resume PDFs.
+        batch_size (int): Texts per nlp.pipe batch.
+
+    Returns:
+        list: One parsed dict per text, as returned by parse_resume_text.
+    """
+    docs = get_nlp().pipe(texts, batch_size=batch_size)
+    return [_extract_features(doc, text) for doc, text in zip(docs, texts)]
 
-    # Extract education sentences using simple heuristics
+def _extract_features(doc, text):
+
+    # Look for the skills and aliases of the shared taxonomy (see skills.py)
+    skills_found = [SKILLS[col] for col in find_skills(text)]
+
+    # Education sentences: those holding a degree word or "university", found in one pass over the text
     education = []
-    education_levels = {"phd": 4, "doctorate": 4, "master": 3, "bachelor": 2, "associate": 1}
     education_level_score = 0
-    for sent in doc.sents:
-        sent_lower = sent.text.lower()
-        if "university" in sent_lower or any(level in sent_lower for level in education_levels.keys()):
-            education.append(sent.text.strip())
-            for level, score in education_levels.items():
-                if level in sent_lower and score > education_level_score:
-                    education_level_score = score
+    matches = list(EDUCATION_PATTERN.finditer(text))
+    if matches:
+        sentences = list(doc.sents)
+        starts = [sent.start_char for sent in sentences]
+        taken = set()
+        for match in matches:
+            if match.group(1):
+                education_level_score = max(education_level_score, EDUCATION_LEVELS[match.group(1).lower()])
+            position = bisect_right(starts, match.start()) - 1
+            if position not in taken:
+                taken.add(position)
+                education.append(sentences[position].text.strip())
 
     # Extract years of experience by searching for patterns like "X years"
     experience_years = 0
     experience = []
-    years_pattern = re.compile(r"(\d+)\s+years?")
-    matches = years_pattern.findall(text_lower)
+    matches = YEARS_PATTERN.findall(text)
     if matches:
         experience_years = max(int(y) for y in matches)
         experience.append(f"Years of experience mentioned: {experience_years}")
 
     # Extract experience summary by searching for years mentioned (basic)
-    years_mentioned = re.findall(r"\b(19|20)\d{2}\b", text)
+    years_mentioned = CALENDAR_YEAR_PATTERN.findall(text)
     if years_mentioned:
         experience.append(f"Years mentioned: {', '.join(set(years_mentioned))}")
 
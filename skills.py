@@ -0,0 +1,161 @@
+# skills.py - Skill taxonomy shared by the resume parser and the job index
+#
+# The taxonomy maps each skill to its aliases (skills.json, or the file named by
+# SKILLS_FILE). Skills and aliases are compiled once into a trie over tokens, so
+# a text is matched in a single pass whose cost does not grow with the taxonomy,
+# and only whole tokens match ("java" is not found inside "javascript"). Tokens
+# written together in a phrase must be written together in the text too, so
+# ".net" is not found in "grew. Net".
+
+import functools
+import hashlib
+import json
+import os
+import re
+
+SKILLS_FILE = os.environ.get("SKILLS_FILE") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills.json")
+# Used when no taxonomy file is found
+DEFAULT_TAXONOMY = {"python": [], "java": [], "c++": [], "machine learning": [], "data analysis": [], "nlp": [],
+                    "sql": [], "javascript": [], "flask": [], "django": [], "react": []}
+
+# Words and single punctuation marks. "c++" and "c#" are phrases of joined tokens, so "+" and "#"
+# also separate words: "python+django", "c++11" and "#python" all contain their skills
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Marks the end of a phrase in the trie
+_END = ""
+# Bumped whenever the matching rules change, so results cached under TAXONOMY_VERSION are recomputed
+MATCHER_VERSION = 3
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+def tokenize_joined(text):
+    """
+    Tokenize a text and tell which tokens are joined to the previous one.
+
+    Returns:
+        tuple: (tokens, joined), where joined[i] is True when token i directly
+            follows token i - 1 with no whitespace between them.
+    """
+    tokens = []
+    joined = []
+    end = None
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        tokens.append(match.group())
+        joined.append(match.start() == end)
+        end = match.end()
+    return tokens, joined
+
+def load_taxonomy(path=SKILLS_FILE):
+    """
+    Read a taxonomy file: a JSON object mapping each skill to a list of aliases.
+
+    Returns:
+        dict: {skill: [aliases]}, in file order, or DEFAULT_TAXONOMY when the file does not exist.
+    """
+    if not path or not os.path.exists(path):
+        return dict(DEFAULT_TAXONOMY)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+class SkillMatcher:
+    """
+    Find the skills of a taxonomy in texts with one pass over their tokens.
+
+    Every skill name and alias is tokenized like the text and inserted into a trie.
+    Single-token phrases are found with one set intersection; longer phrases are
+    walked from the positions whose token starts one. Either way the cost depends
+    on the text length, not on the number of skills. Below its first level the
+    trie is keyed by (token, joined), so "asp.net" only matches tokens written
+    together and "machine learning" only tokens separated by whitespace.
+
+    Args:
+        taxonomy (dict): {skill: [aliases]}; the skill order fixes the columns.
+    """
+
+    def __init__(self, taxonomy):
+        self.skills = list(taxonomy)
+        self._single = {}
+        self._trie = {}
+        for col, (skill, aliases) in enumerate(taxonomy.items()):
+            for phrase in [skill, *aliases]:
+                tokens, joined = tokenize_joined(phrase)
+                if len(tokens) == 1:
+                    self._single.setdefault(tokens[0], set()).add(col)
+                elif tokens:
+                    node = self._trie.setdefault(tokens[0], {})
+                    for key in zip(tokens[1:], joined[1:]):
+                        node = node.setdefault(key, {})
+                    node.setdefault(_END, set()).add(col)
+
+    def find(self, text):
+        """Return the sorted columns of the skills found in the text."""
+        tokens, joined = tokenize_joined(text)
+        found = set()
+        for token in self._single.keys() & set(tokens):
+            found.update(self._single[token])
+        if self._trie:
+            trie = self._trie
+            for start in [i for i, token in enumerate(tokens) if token in trie]:
+                node = trie[tokens[start]]
+                for position in range(start + 1, len(tokens)):
+                    node = node.get((tokens[position], joined[position]))
+                    if node is None:
+                        break
+                    if _END in node:
+                        found.update(node[_END])
+        return sorted(found)
+
+TAXONOMY = load_taxonomy()
+SKILLS = list(TAXONOMY)
+# Changes whenever a skill, an alias or the matching rules change; cached parses and indexes built
+# with another taxonomy are stale
+TAXONOMY_VERSION = hashlib.blake2b(json.dumps([MATCHER_VERSION, TAXONOMY], sort_keys=True).encode("utf-8"),
+                                   digest_size=8).hexdigest()
+
+@functools.lru_cache(maxsize=128)
+def _matcher_for(skills):
+    # Skills outside the taxonomy are matched by their name alone
+    return SkillMatcher({skill: TAXONOMY.get(skill, []) for skill in skills})
+
+def get_matcher(skills=SKILLS):
+    """Return the compiled matcher for a list of skills, building it on first use."""
+    return _matcher_for(tuple(skills))
+
+def find_skills(text, skills=SKILLS):
+    """
+    Return the skills mentioned in the text, by name or alias, matching whole tokens case-insensitively.
+
+    Args:
+        text (str): Text to search.
+        skills (list): Skills to look for.
+
+    Returns:
+        list: Column positions in `skills` of every skill found.
+    """
+    return get_matcher(skills).find(text)
+
+def skill_presence_matrix(texts, skills=SKILLS):
+    """
+    Build a sparse text x skill presence matrix.
+
+    Args:
+        texts (list): Job descriptions (or any texts), one row each.
+        skills (list): Skills, one column each.
+
+    Returns:
+        scipy.sparse.csr_matrix: uint8 matrix with a 1 where the skill occurs in the text.
+    """
+    # Imported here so that modules needing only the taxonomy (the web app at startup) don't load them
+    import numpy as np
+    import scipy.sparse as sp
+
+    matcher = get_matcher(skills)
+    rows = []
+    cols = []
+    for row, text in enumerate(texts):
+        found = matcher.find(text or "")
+        rows.extend([row] * len(found))
+        cols.extend(found)
+    data = np.ones(len(rows), dtype=np.uint8)
+    return sp.csr_matrix((data, (rows, cols)), shape=(len(texts), len(skills)), dtype=np.uint8)
@@ -0,0 +1,133 @@
+# tasks.py - Bounded in-process task queue for slow request work
+#
+# Work submitted here runs on a small thread pool, so a web request can return a
+# task ID right away and the client polls for the result. At most `max_pending`
+# tasks are queued or running; beyond that submit() raises QueueFull and the
+# caller answers with backpressure instead of queueing without limit.
+
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+TASK_WORKERS = int(os.environ.get("TASK_WORKERS", "4"))
+# Tasks queued or running at once
+MAX_PENDING = int(os.environ.get("TASK_QUEUE_SIZE", "32"))
+# Seconds a finished task's result is kept for polling
+RESULT_TTL = 10 * 60
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class QueueFull(Exception):
+    """Every task slot is taken; retry later."""
+
+class Task:
+    def __init__(self, owner=None):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        return {"task_id": self.id, "status": self.status, "error": None if self.error is None else str(self.error)}
+
+class TaskQueue:
+    """
+    Run functions in the background with a bounded number of pending tasks.
+
+    Args:
+        workers (int): Threads running tasks.
+        max_pending (int): Tasks queued or running at once before submit() raises QueueFull.
+        result_ttl (float): Seconds finished tasks stay available to get().
+    """
+
+    def __init__(self, workers=TASK_WORKERS, max_pending=MAX_PENDING, result_ttl=RESULT_TTL):
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="task")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, owner=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs) and return its Task without waiting.
+
+        Args:
+            owner: Who may read the result, e.g. the session's user ID.
+
+        Raises:
+            QueueFull: When max_pending tasks are already queued or running.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFull(f"{self.max_pending} tasks are already pending")
+        task = Task(owner)
+        with self._lock:
+            self._purge()
+            self._tasks[task.id] = task
+        try:
+            self._executor.submit(self._run, task, fn, args, kwargs)
+        except Exception:
+            self._slots.release()
+            with self._lock:
+                self._tasks.pop(task.id, None)
+            raise
+        return task
+
+    def get(self, task_id, owner=None):
+        """Return the task with this ID if it exists and belongs to `owner`, else None."""
+        with self._lock:
+            task = self._tasks.get(task_id)
+        if task is None or task.owner != owner:
+            return None
+        return task
+
+    def pending(self):
+        with self._lock:
+            return sum(1 for task in self._tasks.values() if not task.done.is_set())
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, task, fn, args, kwargs):
+        task.status = RUNNING
+        try:
+            task.result = fn(*args, **kwargs)
+            task.status = DONE
+        except Exception as e:
+            logger.exception("Task %s failed", task.id)
+            task.error = e
+            task.status = FAILED
+        finally:
+            task.finished_at = time.time()
+            task.done.set()
+            self._slots.release()
+
+    def _purge(self):
+        # Forget finished tasks nobody collected within result_ttl
+        cutoff = time.time() - self.result_ttl
+        for task_id in [task_id for task_id, task in self._tasks.items()
+                        if task.finished_at is not None and task.finished_at < cutoff]:
+            del self._tasks[task_id]
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue():
+    """Return the process-wide task queue, starting it on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = TaskQueue()
+        return _queue
@@ -0,0 +1,89 @@
+# fixture_server.py - Local stand-in HTTP server serving the stored result page fixtures
+#
+# Serves benchmarks/fixtures/ on 127.0.0.1 with an ETag per file, answers
+# If-None-Match with 304, can be told to fail a path with 503 a number of times,
+# and records the requests it received.
+
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import FIXTURES_DIR
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        path = self.path.split("?", 1)[0]
+        with server.lock:
+            server.requests.append((path, dict(self.headers)))
+            failures = server.failures.get(path, 0)
+            if failures:
+                server.failures[path] = failures - 1
+        if failures:
+            self.send_error(503)
+            return
+
+        file_path = os.path.join(server.directory, os.path.basename(path))
+        try:
+            with open(file_path, "rb") as f:
+                body = f.read()
+        except OSError:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FixtureServer:
+    """
+    Serve a fixture directory on a free local port in a background thread.
+
+    Use as a context manager; `url(name)` gives the URL of a fixture file.
+    """
+
+    def __init__(self, directory=FIXTURES_DIR):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        self.httpd.directory = directory
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = []
+        self.httpd.failures = {}
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def fail(self, name, times):
+        """Answer the next `times` requests for a fixture with 503."""
+        self.httpd.failures["/" + name] = times
+
+    def url(self, name):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/{name}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
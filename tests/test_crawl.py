@@ -0,0 +1,35 @@
+# test_crawl.py - Crawl checkpoints
+
+import os
+import tempfile
+import unittest
+
+from crawl import Crawler
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.checkpoint_path = os.path.join(tmp_dir.name, "crawl_checkpoint.json")
+        crawler = Crawler(["data engineer"], platforms=["Indeed"], checkpoint_path=self.checkpoint_path)
+        crawler._push({"kind": "search", "platform": "Indeed", "url": "https://www.indeed.com/jobs?q=data", "page": 2})
+        crawler._save_checkpoint([])
+
+    def test_resumes_same_crawl(self):
+        crawler = Crawler(["data engineer"], platforms=["Indeed"], checkpoint_path=self.checkpoint_path)
+        self.assertTrue(crawler._load_checkpoint())
+        self.assertEqual(sum(len(tasks) for tasks in crawler._frontier.values()), 1)
+
+    def test_ignores_checkpoint_of_other_crawl(self):
+        for kwargs in ({"queries": ["python"]}, {"queries": ["data engineer"], "max_pages": 10},
+                       {"queries": ["data engineer"], "location": "Remote"},
+                       {"queries": ["data engineer"], "platforms": ["Indeed", "Upwork"]}):
+            kwargs = dict({"platforms": ["Indeed"]}, **kwargs)
+            with self.subTest(**kwargs):
+                crawler = Crawler(checkpoint_path=self.checkpoint_path, **kwargs)
+                with self.assertLogs("crawl", "WARNING"):
+                    self.assertFalse(crawler._load_checkpoint())
+                self.assertEqual(crawler._frontier, {})
+
+if __name__ == "__main__":
+    unittest.main()
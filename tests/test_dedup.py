@@ -0,0 +1,63 @@
+# test_dedup.py - Near-duplicate clusters in the jobs table
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import database
+import dedup
+from benchmarks import synthetic
+
+class ClusterTest(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        patcher = mock.patch.object(database, "DB_PATH", os.path.join(tmp_dir.name, "jobs.db"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(database.close_connections)
+        database.init_db()
+        self.conn = database.connect()
+
+        self.jobs = synthetic.make_jobs(20)
+        # The same posting syndicated under another URL, ingested later
+        self.duplicate = dict(self.jobs[5], url="https://mirror.example.com/6")
+        database.upsert_jobs(self.conn, self.jobs, ttl=3600)
+        database.upsert_jobs(self.conn, [self.duplicate], ttl=3600)
+        dedup.update_clusters(self.conn)
+        self.canonical_id, self.duplicate_id = [
+            row[0] for row in self.conn.execute("SELECT id FROM jobs WHERE url IN (?, ?) ORDER BY id",
+                                                (self.jobs[5]["url"], self.duplicate["url"]))]
+
+    def urls(self, **kwargs):
+        return {job["url"] for job in database.load_jobs(self.conn, **kwargs)}
+
+    def test_duplicates_are_left_out(self):
+        self.assertEqual(self.urls(), {job["url"] for job in self.jobs})
+        self.assertIn(self.duplicate["url"], self.urls(include_duplicates=True))
+
+    def test_duplicate_replaces_expired_bookmarked_canonical(self):
+        database.create_user(self.conn, "u", "hash")
+        user_id = database.get_user(self.conn, "u")[0]
+        database.toggle_bookmark(self.conn, user_id, self.canonical_id)
+        with self.conn:
+            self.conn.execute("UPDATE jobs SET expires_at = 0 WHERE id = ?", (self.canonical_id,))
+        database.expire_jobs(self.conn)
+        dedup.update_clusters(self.conn)
+
+        # The bookmarked canonical job is kept but expired; its live duplicate stands in for it
+        self.assertIsNotNone(self.conn.execute("SELECT 1 FROM jobs WHERE id = ?", (self.canonical_id,)).fetchone())
+        urls = self.urls()
+        self.assertNotIn(self.jobs[5]["url"], urls)
+        self.assertIn(self.duplicate["url"], urls)
+        self.assertEqual(len(urls), len(self.jobs))
+
+        # Once it is fetched again, the canonical job represents the cluster again
+        database.upsert_jobs(self.conn, [self.jobs[5]], ttl=3600, now=time.time())
+        dedup.update_clusters(self.conn)
+        self.assertEqual(self.urls(), {job["url"] for job in self.jobs})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# test_http_fetch.py - The fetch layer against a local stand-in server serving fixture pages
+
+import os
+import tempfile
+import time
+import unittest
+
+import requests
+
+import http_fetch
+from tests.fixture_server import FixtureServer
+
+class FetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.server = FixtureServer().start()
+        self.addCleanup(self.server.stop)
+        self.fetcher = http_fetch.Fetcher(cache_dir=self.cache_dir.name, retries=2, backoff_factor=0)
+
+    def _expire(self, url):
+        entry = self.fetcher._load(url)
+        entry["fetched_at"] -= self.fetcher.ttl + 1
+        self.fetcher._store_meta(url, entry)
+
+    def test_fresh_cache_hit_sends_no_request(self):
+        url = self.server.url("indeed.html")
+        first = self.fetcher.fetch(url)
+        second = self.fetcher.fetch(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_stale_entry_is_revalidated_with_304(self):
+        url = self.server.url("glassdoor.html")
+        first = self.fetcher.fetch(url)
+        self._expire(url)
+        second = self.fetcher.fetch(url)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+        _, headers = self.server.requests[-1]
+        self.assertIn("If-None-Match", headers)
+        # Revalidation makes the entry fresh again
+        self.fetcher.fetch(url)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_retries_on_503(self):
+        self.server.fail("linkedin.html", 2)
+        response = self.fetcher.fetch(self.server.url("linkedin.html"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.from_cache)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_stale_copy_served_when_server_is_down(self):
+        url = self.server.url("upwork.html")
+        first = self.fetcher.fetch(url)
+        self._expire(url)
+        self.server.stop()
+        second = self.fetcher.fetch(url)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.content, first.content)
+
+    def test_stale_copy_served_when_retries_run_out(self):
+        url = self.server.url("upwork.html")
+        first = self.fetcher.fetch(url)
+        self._expire(url)
+        self.server.fail("upwork.html", 10)
+        second = self.fetcher.fetch(url)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+
+    def test_error_status_without_cached_copy(self):
+        self.server.fail("upwork.html", 10)
+        response = self.fetcher.fetch(self.server.url("upwork.html"))
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.from_cache)
+        with self.assertRaises(requests.HTTPError):
+            response.raise_for_status()
+
+    def test_prune_deletes_entries_past_max_age(self):
+        old_url = self.server.url("indeed.html")
+        new_url = self.server.url("freelancer.html")
+        self.fetcher.fetch(old_url)
+        self.fetcher.fetch(new_url)
+        long_ago = time.time() - self.fetcher.max_age - 60
+        for suffix in (".json", ".body"):
+            os.utime(self.fetcher._path(old_url, suffix), (long_ago, long_ago))
+        self.assertEqual(self.fetcher.prune(), 1)
+        self.assertIsNone(self.fetcher._load(old_url))
+        self.assertIsNotNone(self.fetcher._load(new_url))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# test_job_scraper.py - The platform parsers on the stored result and job page fixtures
+
+import tempfile
+import unittest
+from unittest import mock
+from urllib.parse import urljoin
+
+import requests
+
+import http_fetch
+import job_scraper
+from benchmarks import synthetic
+from tests.fixture_server import FixtureServer
+
+PARSERS = ["html.parser"] + (["lxml"] if job_scraper.HTML_PARSER == "lxml" else [])
+
+class ParserTest(unittest.TestCase):
+    def test_parse_cards_reads_every_card(self):
+        for parser in PARSERS:
+            for platform in job_scraper.PLATFORMS:
+                with self.subTest(parser=parser, platform=platform), \
+                        mock.patch.object(job_scraper, "HTML_PARSER", parser):
+                    jobs = job_scraper.parse_cards(synthetic.load_fixture(platform), platform, limit=None)
+                    self.assertEqual(len(jobs), synthetic.FIXTURE_CARDS)
+
+    def test_parse_next_page(self):
+        page_url = "https://jobs.example.com/search?page=1"
+        for parser in PARSERS:
+            for platform in job_scraper.PLATFORMS:
+                with self.subTest(parser=parser, platform=platform), \
+                        mock.patch.object(job_scraper, "HTML_PARSER", parser):
+                    _, href = synthetic.NEXT_PAGE_LINKS[platform]
+                    html = synthetic.load_fixture(platform)
+                    self.assertEqual(job_scraper.parse_next_page(html, platform, page_url), urljoin(page_url, href))
+                    self.assertIsNone(job_scraper.parse_next_page(synthetic.load_fixture(platform, "detail"),
+                                                                  platform, page_url))
+
+    def test_parse_detail(self):
+        for parser in PARSERS:
+            for platform in job_scraper.PLATFORMS:
+                with self.subTest(parser=parser, platform=platform), \
+                        mock.patch.object(job_scraper, "HTML_PARSER", parser):
+                    _, job = synthetic.detail_page(platform)
+                    fields = job_scraper.parse_detail(synthetic.load_fixture(platform, "detail"), platform)
+                    self.assertEqual(fields, {"description": job["description"]})
+
+class ScrapeTest(unittest.TestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.server = FixtureServer().start()
+        self.addCleanup(self.server.stop)
+        patcher = mock.patch.object(job_scraper, "fetcher",
+                                    http_fetch.Fetcher(cache_dir=cache_dir.name, retries=1, backoff_factor=0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_scrape_platform(self):
+        jobs = job_scraper.scrape_platform("Indeed", "python", url_override=self.server.url("indeed.html"))
+        self.assertEqual(len(jobs), job_scraper.CARDS_PER_PAGE)
+
+    def test_error_status_is_a_failure(self):
+        self.server.fail("indeed.html", 10)
+        with self.assertRaises(requests.HTTPError):
+            job_scraper.scrape_platform("Indeed", "python", url_override=self.server.url("indeed.html"))
+
+if __name__ == "__main__":
+    unittest.main()
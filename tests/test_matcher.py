@@ -0,0 +1,42 @@
+# test_matcher.py - Top-K matching over the job index against full matching
+
+import unittest
+
+from benchmarks import synthetic
+from job_index import JobIndex
+from matcher import match_jobs, match_top_k
+
+def _ranking(jobs):
+    return [(job["id"], job["match_score"]) for job in jobs]
+
+class TopKTest(unittest.TestCase):
+    def assert_top_k_matches(self, resume, jobs, index, k):
+        expected = _ranking(match_jobs(resume, [dict(job) for job in jobs], index)[:k])
+        self.assertEqual(_ranking(match_top_k(resume, jobs, index, k=k)), expected)
+
+    def test_equals_first_k_of_match_jobs(self):
+        jobs = synthetic.make_jobs(300)
+        # The last jobs were ingested after the index was built
+        index = JobIndex.build(jobs[:250])
+        for text in synthetic.make_resumes(5):
+            for k in (1, 10, 50):
+                with self.subTest(k=k):
+                    self.assert_top_k_matches(synthetic.resume_data(text), jobs, index, k)
+
+    def test_skill_without_shared_term(self):
+        jobs = [{"id": number, "description": f"Warehouse picker number {number} wanted"} for number in range(1, 6)]
+        jobs.append({"id": 6, "description": "We use python3 and django"})
+        index = JobIndex.build(jobs)
+        resume = {"skills": ["python"], "education_level_score": 0, "experience_years": 0,
+                  "full_text": "experienced python developer warehouse"}
+        self.assertEqual(match_top_k(resume, jobs, index, k=3)[0]["id"], 6)
+        self.assert_top_k_matches(resume, jobs, index, 3)
+
+    def test_resume_sharing_nothing(self):
+        jobs = synthetic.make_jobs(30)
+        index = JobIndex.build(jobs)
+        resume = {"skills": [], "education_level_score": 2, "experience_years": 5, "full_text": "zzqx"}
+        self.assert_top_k_matches(resume, jobs, index, 10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+# test_skills.py - Whole-token skill matching
+
+import unittest
+
+from skills import SkillMatcher
+
+class SkillMatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.matcher = SkillMatcher({"java": [], "javascript": ["js"], ".net": ["dotnet"], "asp.net": [],
+                                     "machine learning": ["ml"], "c++": [], "c#": [], "python": ["python3"],
+                                     "django": [], "sql": []})
+
+    def find(self, text):
+        return [self.matcher.skills[col] for col in self.matcher.find(text)]
+
+    def test_whole_tokens_only(self):
+        self.assertEqual(self.find("JavaScript and C++"), ["javascript", "c++"])
+        self.assertEqual(self.find("Java, JS"), ["java", "javascript"])
+        self.assertEqual(self.find("Python3 and CPython"), ["python"])
+
+    def test_plus_and_hash_separate_words(self):
+        self.assertEqual(self.find("Python+Django"), ["python", "django"])
+        self.assertEqual(self.find("SQL+Python"), ["python", "sql"])
+        self.assertEqual(self.find("C++11, C#"), ["c++", "c#"])
+        self.assertEqual(self.find("#python"), ["python"])
+        self.assertEqual(self.find("C + +"), [])
+
+    def test_phrases_across_whitespace(self):
+        self.assertEqual(self.find("Machine\nLearning"), ["machine learning"])
+
+    def test_joined_tokens_stay_joined(self):
+        self.assertEqual(self.find("Built on ASP.NET"), [".net", "asp.net"])
+        self.assertEqual(self.find("Revenue grew. Net income rose"), [])
+        self.assertEqual(self.find("asp. net"), [])
+
+if __name__ == "__main__":
+    unittest.main()